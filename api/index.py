@@ -1,18 +1,354 @@
-import subprocess
+"""
+HTTP validation API for machine clients (deployment pipelines).
+
+    GET  /api/health     pool status
+    POST /api/validate   validate a project, JSON report in the response
+
+The POST body is either a project ZIP (Content-Type: application/zip) or a
+JSON object:
+
+    {
+        "files": {"devices.json": "<file text>", ...},
+        "roles": {"hmi.json": "Config"},                  optional
+        "map_types": {"precharge.json": "Precharge"},     optional
+        "default_map_type": "Modbus TCP/IP",              optional
+        "max_errors": 100                                 optional
+    }
+
+Files without a role or map type in the request are classified from their
+content (validators.classifier); each file in the report carries the
+"confidence" of that detection. ZIP members keep their folder paths; an archive with several sites (folders
+holding a devices.json) gets one report per site under "sites". Members
+are decompressed one at a time within size limits (see helpers.io.ZipSource);
+exceeding them answers 413.
+
+For ZIP uploads the options go in the query string:
+?max_errors=100&default_map_type=CANbus&role=hmi.json=Config&map_type=precharge.json=Precharge
+
+Validation runs in a bounded worker pool. At most workers + queue requests
+are accepted at a time; further requests get 503 with Retry-After instead
+of piling up. A request gets 504 when its report is not ready TIMEOUT
+seconds after it was accepted, queueing included; its job is cancelled if
+it has not started. A running job cannot be cancelled, so process pool
+jobs carry that same deadline: a job reaching a worker after it is skipped
+and a running job is stopped at it, so no job keeps its slot after its
+client got the 504. Thread pool jobs (and, on platforms without
+setitimer, running jobs) run to completion.
+
+Run locally:
+
+    python -m api.index --port 8000
+    curl -H "Content-Type: application/zip" --data-binary @site.zip http://localhost:8000/api/validate
+"""
+
+import io
+import json
 import os
-import sys
-
-# Vercel provides PORT env var
-port = os.environ.get("PORT", "3000")
-
-# Launch Streamlit on that port
-cmd = [
-    "streamlit", "run", "../app.py",  # adjust if your file is main.py etc.
-    f"--server.port={port}",
-    "--server.headless=true",
-    "--server.enableCORS=false",
-    "--server.enableXsrfProtection=false"
-]
-
-# Run it (this is blocking, which Vercel likes for serverless-ish)
-subprocess.run(cmd, check=True)
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from helpers.io import MemorySource, ZipLimitError, ZipSource
+from validators.pipeline import FILE_ROLES, DEFAULT_MAP_TYPE, validate_source
+from schemas.schemas import addressMapSchemas
+
+WORKERS = int(os.environ.get("VALIDATOR_WORKERS", os.cpu_count() or 1))
+QUEUE_SIZE = int(os.environ.get("VALIDATOR_QUEUE", WORKERS * 2))
+# Serverless runtimes generally cannot fork worker processes
+POOL = os.environ.get("VALIDATOR_POOL", "thread" if os.environ.get("VERCEL") else "process")
+MAX_BODY_BYTES = int(os.environ.get("VALIDATOR_MAX_BODY", 50 * 1024 * 1024))
+TIMEOUT = float(os.environ.get("VALIDATOR_TIMEOUT", 60))
+
+
+class BadRequest(Exception):
+    pass
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _stop_job(_signum, _frame):
+    raise JobTimeout("Validation deadline passed")
+
+
+def run_until(deadline: float, fn, *args):
+    """
+    Run fn in a process pool worker, raising JobTimeout in it at deadline
+    (a time.time() value).
+    """
+    import signal
+
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise JobTimeout("Validation deadline passed")
+    if not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    previous = signal.signal(signal.SIGALRM, _stop_job)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def validate_upload(upload, roles: dict, map_types: dict, default_map_type: str, max_errors: Optional[int]) -> dict:
+    """
+    Validate a ZIP body (bytes, decompressed member by member within the
+    ZipSource limits) or a list of {"name", "bytes"} items. Archives with
+    several sites (folders holding a devices.json) get one report per site.
+    """
+    source = ZipSource(io.BytesIO(upload)) if isinstance(upload, bytes) else MemorySource(upload)
+    with source:
+        reports = validate_source(source, roles, map_types, default_map_type, max_errors=max_errors)
+
+    if len(reports) == 1:
+        return next(iter(reports.values())).to_dict()
+
+    sites = [{"site": site, **report.to_dict()} for site, report in reports.items()]
+    statuses = {site["status"] for site in sites}
+    status = "errors" if "errors" in statuses else "warnings" if "warnings" in statuses else "valid"
+    return {"status": status, "sites": sites}
+
+
+class ValidationPool:
+    """
+    Executor with a fixed number of slots (running plus queued jobs);
+    submit() returns None instead of queueing when every slot is taken.
+    A slot is released when its job finishes or is cancelled. With
+    job_limit, process pool jobs are stopped job_limit seconds after they
+    were submitted.
+    """
+
+    def __init__(self, workers: int, queue_size: int, kind: str = "process", job_limit: Optional[float] = None):
+        # Imported here so a cold start that only serves /api/health or a
+        # 4xx response does not pay for the executor machinery
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        executor_class = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._job_limit = job_limit if kind == "process" else None
+        self._executor = executor_class(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if self._job_limit is None:
+                future = self._executor.submit(fn, *args)
+            else:
+                future = self._executor.submit(run_until, time.time() + self._job_limit, fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+
+_pool: Optional[ValidationPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ValidationPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ValidationPool(WORKERS, QUEUE_SIZE, POOL, job_limit=TIMEOUT)
+        return _pool
+
+
+def _parse_assignments(values, allowed: list[str], option: str) -> dict[str, str]:
+    if isinstance(values, dict):
+        pairs = values.items()
+    elif isinstance(values, list) and all(isinstance(value, str) for value in values):
+        pairs = [value.partition("=")[::2] for value in values]
+    else:
+        raise BadRequest(f"{option} must be an object mapping file names to values or a list of FILE=VALUE strings")
+
+    assignments: dict[str, str] = {}
+    for file_name, choice in pairs:
+        if choice not in allowed:
+            raise BadRequest(f"{option} expects FILE=VALUE with VALUE one of: {', '.join(allowed)}")
+        assignments[file_name] = choice
+    return assignments
+
+
+def parse_request(content_type: str, query: dict[str, list[str]], body: bytes) -> tuple:
+    """
+    Arguments for validate_upload from a POST /api/validate request.
+    """
+    options = {
+        "roles": query.get("role", []),
+        "map_types": query.get("map_type", []),
+        "default_map_type": query.get("default_map_type", [DEFAULT_MAP_TYPE])[-1],
+        "max_errors": query.get("max_errors", [None])[-1],
+    }
+
+    if content_type in ("application/zip", "application/x-zip-compressed", "application/octet-stream"):
+        import zipfile
+
+        try:
+            with ZipSource(io.BytesIO(body)) as source:
+                has_files = bool(source.names)
+        except zipfile.BadZipFile as e:
+            raise BadRequest(f"Could not read ZIP: {e}")
+        upload = body
+    elif content_type == "application/json":
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            raise BadRequest(f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict) or not isinstance(payload.get("files"), dict):
+            raise BadRequest("JSON body must be an object with a 'files' object mapping file names to file contents")
+
+        upload = []
+        for name, content in payload["files"].items():
+            if not isinstance(content, str):
+                content = json.dumps(content)
+            upload.append({"name": name, "bytes": content.encode("utf-8")})
+        has_files = bool(upload)
+
+        for key in options:
+            if key in payload:
+                options[key] = payload[key]
+    else:
+        raise BadRequest("Content-Type must be application/zip or application/json")
+
+    if not has_files:
+        raise BadRequest("No .json files found in the request")
+
+    map_types = list(addressMapSchemas.keys())
+    if options["default_map_type"] not in map_types:
+        raise BadRequest(f"default_map_type must be one of: {', '.join(map_types)}")
+
+    max_errors = options["max_errors"]
+    if max_errors is not None:
+        try:
+            max_errors = int(max_errors)
+        except (TypeError, ValueError):
+            raise BadRequest("max_errors must be an integer")
+        if max_errors < 1:
+            raise BadRequest("max_errors must be at least 1")
+
+    return (
+        upload,
+        _parse_assignments(options["roles"], FILE_ROLES, "role"),
+        _parse_assignments(options["map_types"], map_types, "map_type"),
+        options["default_map_type"],
+        max_errors,
+    )
+
+
+# Vercel's Python runtime serves the BaseHTTPRequestHandler subclass named "handler"
+class handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, headers: Optional[dict] = None):
+        self._send_json(status, {"error": message}, headers)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if path != "/api/health":
+            self._send_error(404, "Not found")
+            return
+
+        pool = get_pool()
+        self._send_json(200, {"status": "ok", "workers": pool.workers, "capacity": pool.capacity, "in_flight": pool.in_flight})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/api/validate":
+            self._send_error(404, "Not found")
+            return
+
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            self._send_error(411, "Content-Length required")
+            return
+        if int(length) > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_error(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+            return
+
+        body = self.rfile.read(int(length))
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+        try:
+            args = parse_request(content_type, parse_qs(url.query), body)
+        except BadRequest as e:
+            self._send_error(400, str(e))
+            return
+
+        future = get_pool().submit(validate_upload, *args)
+        if future is None:
+            self._send_error(503, "Validation queue is full, retry later", {"Retry-After": "1"})
+            return
+
+        from concurrent.futures import TimeoutError
+
+        try:
+            report = future.result(timeout=TIMEOUT)
+        except (TimeoutError, JobTimeout):
+            # Frees the slot of a job that has not started yet
+            future.cancel()
+            self._send_error(504, f"Validation did not finish within {TIMEOUT:g} seconds")
+            return
+        except ZipLimitError as e:
+            self._send_error(413, str(e))
+            return
+        except Exception as e:
+            self._send_error(500, f"Validation failed: {e}")
+            return
+
+        self._send_json(200, report)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the validation API over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "3000")))
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Serving validation API on http://{args.host}:{args.port}/api/validate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Scaling benchmark: times each validator and the full-project pipeline on
+synthetic projects (benchmarks.synthetic) of increasing size.
+
+Each measurement calls the workload in a loop lasting at least --min-time
+seconds (like timeit's autorange) and keeps the best of --repeat loops, so
+even the smallest scales are timed over many milliseconds.
+
+For every benchmark the growth exponent is fitted on log(time) against
+log(size); an exponent above --max-exponent is flagged as super-linear.
+With --record the run is appended to a JSON lines history file and
+compared with the previous run in it; a time more than --tolerance slower
+at the same size is flagged as a regression.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scaling [--scales 1 2 4 8] [--record benchmarks/scaling.jsonl]
+
+Exits with status 1 when anything was flagged.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import timeit
+
+from benchmarks.synthetic import generate_project
+from validators.address_map import validate_address_map
+from validators.classifier import classify
+from validators.control_map import validate_control_maps
+from validators.devices import validate_devices
+from validators.commands import INVALID, parse_commands
+from validators.index import file_ref
+from validators.project import find_missing_device_references, validate_control_map_commands
+from validators.pipeline import build_project_context, build_selections, validate_project
+from validators.suggest import NameIndex
+
+BASE_DEVICES = 25
+BASE_REGISTERS = 250
+
+
+def best_of(fn, repeat: int, min_time: float) -> float:
+    """
+    Best seconds per call over repeat loops of at least min_time seconds.
+    timeit keeps the garbage collector off while timing.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        # Aim a little past min_time rather than doubling up to it
+        number = max(number * 2, math.ceil(number * min_time * 1.2 / max(elapsed, 1e-9)))
+    return min([elapsed] + timer.repeat(repeat - 1, number)) / number
+
+
+def workloads(scale: int, error_rate: float, seed: int) -> dict[str, tuple[int, object, dict]]:
+    """
+    benchmark name -> (input size, zero-argument callable, other counts
+    reported with the size) for one scale.
+    """
+    items = generate_project(
+        devices=BASE_DEVICES * scale,
+        registers_per_map=BASE_REGISTERS * scale,
+        error_rate=error_rate,
+        seed=seed,
+    )
+    map_types = {item["name"]: item["map_type"] for item in items if "map_type" in item}
+    selections = build_selections(items, map_types=map_types)
+    context, _ = build_project_context(selections)
+
+    by_role: dict[str, list[dict]] = {}
+    for sel in selections:
+        by_role.setdefault(sel["role"], []).append(sel)
+
+    modbus = next(s for s in selections if s.get("map_type") == "Modbus TCP/IP")
+    canbus = next((s for s in selections if s.get("map_type") == "CANbus"), None)
+    control_maps = by_role["Control Map"]
+    devices = context.devices_payload
+
+    # Every tenth register name with two adjacent characters swapped
+    register_names = [reg["name"] for reg in modbus["data"] if isinstance(reg.get("name"), str)]
+    misspelled = [name[:2] + name[3] + name[2] + name[4:] for name in register_names[::10] if len(name) > 4]
+
+    def suggest_names():
+        name_index = NameIndex(register_names)
+        for name in misspelled:
+            name_index.suggest(name)
+
+    # The command check looks up every command reference once per address
+    # map its control map is used with; reported next to the rows
+    command_lookups = 0
+    for sel in control_maps:
+        if not isinstance(sel["data"], list):
+            continue
+        references = sum(
+            1
+            for cm in sel["data"]
+            if isinstance(cm, dict) and isinstance(cm.get("commands"), str) and cm["commands"].strip()
+            for command in parse_commands(cm["commands"])
+            if command.kind != INVALID
+        )
+        pairs = context.index.address_maps_for_control_map(file_ref(sel["name"]))
+        command_lookups += references * sum(1 for ref in pairs if context.index.registers_by_name(f"{ref}.json") is not None)
+
+    def check_control_map_commands():
+        for sel in control_maps:
+            validate_control_map_commands(
+                control_map_file=sel["name"],
+                control_map=sel["data"],
+                devices=devices,
+                address_maps_by_file=context.address_maps_by_file,
+                index=context.index,
+            )
+
+    control_rows = sum(len(s["data"]) for s in control_maps)
+    loads = {
+        "address_map.modbus": (len(modbus["data"]), lambda: validate_address_map(modbus["data"], "Modbus TCP/IP", include_summary=True), {}),
+        "devices": (len(devices), lambda: validate_devices(devices), {}),
+        "control_maps": (control_rows, lambda: [validate_control_maps(s["data"]) for s in control_maps], {}),
+        "project.device_references": (
+            len(devices),
+            lambda: find_missing_device_references(devices, context.available_files, index=context.index),
+            {},
+        ),
+        "project.control_map_commands": (control_rows, check_control_map_commands, {"lookups": command_lookups}),
+        "classify": (len(selections), lambda: [classify(s["data"]) for s in selections], {}),
+        "suggest": (len(register_names), suggest_names, {}),
+        "pipeline": (
+            sum(len(s["data"]) for s in selections if isinstance(s["data"], list)),
+            lambda: validate_project(build_selections(items, map_types=map_types)),
+            {},
+        ),
+    }
+    if canbus is not None:
+        loads["address_map.canbus"] = (len(canbus["data"]), lambda: validate_address_map(canbus["data"], "CANbus", include_summary=True), {})
+
+    return loads
+
+
+def growth_exponent(points: list[dict]) -> float:
+    """
+    Least squares slope of log(seconds) over log(size): 1 is linear.
+    """
+    xs = [math.log(p["size"]) for p in points]
+    ys = [math.log(max(p["seconds"], 1e-9)) for p in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+
+def last_record(path: str):
+    if not os.path.exists(path):
+        return None
+    record = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+    return record
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the validators on synthetic projects of increasing size.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4, 8], help="Size multipliers (default: 1 2 4 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed loops per measurement, best is kept (default: 3)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed loop (default: 0.2)")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="Growth exponent flagged as super-linear (default: 1.3)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Slowdown against the previous record flagged as a regression (default: 0.25)")
+    parser.add_argument("--record", metavar="FILE", help="Append the results to this JSON lines file and compare with its last entry")
+    args = parser.parse_args(argv)
+
+    results: dict[str, list[dict]] = {}
+    for scale in sorted(args.scales):
+        for name, (size, fn, counts) in workloads(scale, args.error_rate, args.seed).items():
+            seconds = best_of(fn, args.repeat, args.min_time)
+            results.setdefault(name, []).append({"scale": scale, "size": size, "seconds": seconds, **counts})
+
+    previous = last_record(args.record) if args.record else None
+    summary: dict[str, dict] = {}
+    flagged = []
+
+    print(f"{'benchmark':<30} {'size':>9} {'seconds':>10} {'us/item':>9}")
+    for name, points in results.items():
+        # Only sizes present in both runs are compared (same scales, seed and generator)
+        baseline = {(p["scale"], p["size"]): p["seconds"] for p in (previous or {}).get("results", {}).get(name, {}).get("points", [])}
+
+        for p in points:
+            note = "".join(f"  {count} {key}" for key, count in p.items() if key not in ("scale", "size", "seconds"))
+            before = baseline.get((p["scale"], p["size"]))
+            if before and p["seconds"] > before * (1 + args.tolerance):
+                note += f"  REGRESSION ({before:.4f}s before)"
+                flagged.append(f"{name} at scale {p['scale']}: {before:.4f}s -> {p['seconds']:.4f}s")
+            print(f"{name:<30} {p['size']:>9} {p['seconds']:>10.4f} {p['seconds'] * 1e6 / max(p['size'], 1):>9.2f}{note}")
+
+        exponent = growth_exponent(points) if len(points) > 1 else None
+        if exponent is not None:
+            print(f"{'':<30} growth exponent {exponent:.2f}")
+            if exponent > args.max_exponent:
+                flagged.append(f"{name} grows super-linearly (exponent {exponent:.2f})")
+        summary[name] = {"points": points, "exponent": exponent}
+
+    if args.record:
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": summary,
+        }
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    for message in flagged:
+        print(f"flagged: {message}", file=sys.stderr)
+
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
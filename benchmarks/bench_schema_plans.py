@@ -0,0 +1,118 @@
+"""
+Per-register cost of the raw-schema register checks versus the compiled
+schema plans used by validate_address_map.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_schema_plans [number_of_registers]
+"""
+
+import sys
+import time
+
+from schemas.schemas import addressMapSchemas
+from schemas.compiler import get_address_map_plan
+from helpers.typing import validateType, expectedTypeToString
+from validators.result import ValidationResult
+
+
+def make_registers(count: int) -> list[dict]:
+    datatypes = ["int16", "uint16", "int32", "uint32", "float32"]
+    registers = []
+    for i in range(count):
+        reg = {
+            "name": f"measure.value.{i}",
+            "address": i * 2,
+            "numberOfRegisters": 2,
+            "datatype": datatypes[i % len(datatypes)],
+            "functionCode": 3,
+            "scaling": 0.1,
+            "direction": "input",
+        }
+        if i % 10 == 0:
+            reg["datatype"] = "double"  # invalid enum value
+        if i % 25 == 0:
+            reg["unit"] = "V"           # unknown field
+        registers.append(reg)
+    return registers
+
+
+def check_registers_raw(registers: list[dict], map_type: str) -> ValidationResult:
+    # Register checks as they were done before schema plans were introduced.
+    result = ValidationResult([])
+    required = addressMapSchemas[map_type]["required"]
+    optional = addressMapSchemas[map_type]["optional"]
+
+    for idx, reg in enumerate(registers):
+        name = reg.get("name", f"register[{idx}]")
+
+        for field, expected in required.items():
+            if field not in reg:
+                result.add("error", f"Register '{name}' missing '{field}'")
+            elif not validateType(reg[field], expected):
+                result.add("error", f"Register '{name}' field '{field}' expected {expectedTypeToString(expected)}")
+
+        for field, expected in optional.items():
+            if field in reg and not validateType(reg[field], expected):
+                result.add("warning", f"Register '{name}' optional field '{field}' expected {expectedTypeToString(expected)}")
+
+        unknown = set(reg) - set(required) - set(optional)
+        if unknown:
+            result.add("warning", f"Register '{name}' unknown fields: {', '.join(unknown)}")
+
+    return result
+
+
+def check_registers_compiled(registers: list[dict], map_type: str) -> ValidationResult:
+    result = ValidationResult([])
+    plan = get_address_map_plan(map_type)
+
+    for idx, reg in enumerate(registers):
+        name = reg.get("name", f"register[{idx}]")
+
+        for rule in plan.required:
+            if rule.field not in reg:
+                result.emit("error", rule.missing_code, name, rule.field)
+            elif not rule.accepts(reg[rule.field]):
+                result.emit("error", rule.type_code, name, rule.field, rule.expected)
+
+        for rule in plan.optional:
+            if rule.field in reg and not rule.accepts(reg[rule.field]):
+                result.emit("warning", rule.type_code, name, rule.field, rule.expected)
+
+        if not plan.allowed_keys.issuperset(reg):
+            unknown = [key for key in reg if key not in plan.allowed_keys]
+            result.emit("warning", plan.unknown_code, name, ', '.join(unknown))
+
+    return result
+
+
+def best_of(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    map_type = "Modbus TCP/IP"
+    registers = make_registers(count)
+
+    raw = check_registers_raw(registers, map_type)
+    compiled = check_registers_compiled(registers, map_type)
+    assert raw.total == compiled.total
+
+    raw_time = best_of(check_registers_raw, registers, map_type)
+    compiled_time = best_of(check_registers_compiled, registers, map_type)
+
+    print(f"registers:      {count}")
+    print(f"raw schema:     {raw_time * 1e6 / count:.2f} us/register")
+    print(f"compiled plan:  {compiled_time * 1e6 / count:.2f} us/register")
+    print(f"speedup:        {raw_time / compiled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Cold start benchmark: time to import each entry point in a fresh
+interpreter, minus the bare interpreter startup.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--runs 10] [--budget-ms 60] [--top 10]
+
+With --budget-ms, exits with status 1 when an entry point takes longer to
+import than the budget. --top lists the slowest modules of each entry point
+(from python -X importtime).
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = {
+    "pipeline": "import validators.pipeline",
+    "cli": "import cli",
+    "api": "import api.index",
+    "registry": "import validators.registry",
+}
+
+
+def import_seconds(statement: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def slowest_modules(statement: str, count: int) -> list[tuple[int, str]]:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, _ = line[len("import time:"):].split("|", 2)
+        modules.append((int(self_us), line.rsplit("|", 1)[1].strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold import time of the entry points.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per entry point, the median is kept (default: 10)")
+    parser.add_argument("--budget-ms", type=float, help="Fail when an entry point imports slower than this")
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest modules (self time) per entry point")
+    args = parser.parse_args(argv)
+
+    interpreter = import_seconds("pass", args.runs)
+    print(f"interpreter startup: {interpreter * 1000:.1f} ms")
+
+    over_budget = []
+    for name, statement in ENTRY_POINTS.items():
+        cost = max(import_seconds(statement, args.runs) - interpreter, 0.0)
+        print(f"{name:<12} {cost * 1000:>7.1f} ms   ({statement})")
+        if args.budget_ms is not None and cost * 1000 > args.budget_ms:
+            over_budget.append(name)
+
+        for self_us, module in slowest_modules(statement, args.top):
+            print(f"{'':<14}{self_us / 1000:>6.1f} ms  {module}")
+
+    for name in over_budget:
+        print(f"over budget: {name}", file=sys.stderr)
+
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Synthetic project generator.
+
+Builds a complete project (config.json, devices.json, address maps and
+control maps) from the schemas in schemas.schemas, so the validators can be
+exercised at any size:
+
+    devices              number of devices
+    registers_per_map    registers in each address map
+    expression_density   fraction of address map registers that are expressions
+    shared_map_ratio     fraction of devices reusing an existing address/control map
+    error_rate           fraction of devices, registers and control registers
+                         given a schema or reference error
+
+Write a project to disk from the repository root:
+
+    python -m benchmarks.synthetic OUT_DIR [--devices N] [--registers N] ...
+"""
+
+import argparse
+import json
+import os
+import random
+
+from schemas.schemas import addressMapSchemas, configSchema, controlMapSchema, deviceSchemas
+
+DATATYPE_REGISTERS = {
+    "int8": 1, "uint8": 1, "int16": 1, "uint16": 1,
+    "int32": 2, "uint32": 2, "float32": 2,
+    "int64": 4, "uint64": 4, "float64": 4,
+    "string32": 16,
+}
+DATATYPE_BITS = {
+    "int8": 8, "uint8": 8, "int16": 16, "uint16": 16,
+    "int32": 32, "uint32": 32, "float32": 32,
+    "int64": 64, "uint64": 64, "float64": 64,
+}
+
+# Device type -> address map type; protocol devices get a Modbus map and a control map
+DEVICE_MAP_TYPES = {
+    "converter": "Modbus TCP/IP",
+    "battery": "Modbus TCP/IP",
+    "other": "CANbus",
+    "digitalInputOutput": "Digital I/O",
+    "analogInputOutput": "Analog I/O",
+    "precharge": "Precharge",
+    "breaker": "Breaker",
+    "contactor": "Contactor",
+}
+DEVICE_TYPE_WEIGHTS = {
+    "converter": 6,
+    "battery": 4,
+    "other": 2,
+    "digitalInputOutput": 1,
+    "analogInputOutput": 1,
+    "precharge": 1,
+    "breaker": 1,
+    "contactor": 1,
+}
+REQUIRED_IO_REGISTERS = {
+    "Precharge": [
+        ("control.contactor.main", "output"),
+        ("control.contactor.auxiliary", "output"),
+        ("measure.contactor.main", "input"),
+        ("measure.contactor.auxiliary", "input"),
+    ],
+    "Breaker": [("measure.breaker", "input")],
+    "Contactor": [("measure.contactor", "input")],
+}
+
+
+def sample_value(expected, rng: random.Random, field: str):
+    """
+    A value of the type a schema entry expects.
+    """
+    if isinstance(expected, list):
+        return rng.choice(expected)
+    if isinstance(expected, tuple):
+        expected = expected[0]
+    if expected is bool:
+        return rng.random() < 0.5
+    if expected is int:
+        return rng.randint(0, 1000)
+    if expected is float:
+        return round(rng.uniform(0, 1000), 2)
+    if expected is dict:
+        return {}
+    return f"{field}-{rng.randint(0, 9999)}"
+
+
+def sample_config(schema: dict, rng: random.Random):
+    if not isinstance(schema, dict):
+        return sample_value(schema, rng, "value")
+
+    node = {key: sample_config(expected, rng) for key, expected in schema.get("required", {}).items()}
+    for key, expected in schema.get("optional", {}).items():
+        if rng.random() < 0.5:
+            node[key] = sample_config(expected, rng)
+    return node
+
+
+def inject_error(entry: dict, required: dict, rng: random.Random, key_field: str):
+    """
+    Break one entry: drop a required field, give it a wrong type or add an
+    unknown field. The key field (name / id) is left alone.
+    """
+    fields = [f for f in required if f != key_field and f in entry]
+    kind = rng.randrange(3)
+    if kind == 0 and fields:
+        del entry[rng.choice(fields)]
+    elif kind == 1 and fields:
+        field = rng.choice(fields)
+        entry[field] = [entry[field]]
+    else:
+        entry["unexpectedField"] = True
+
+
+def modbus_registers(count: int, rng: random.Random) -> list[dict]:
+    schema = addressMapSchemas["Modbus TCP/IP"]
+    registers = []
+    address = 0
+    for i in range(count):
+        datatype = rng.choice(list(DATATYPE_REGISTERS))
+        reg = {
+            "name": "communicationCheck" if i == 0 else f"measure.value.{i}",
+            "address": address,
+            "numberOfRegisters": DATATYPE_REGISTERS[datatype],
+            "datatype": datatype,
+            "functionCode": rng.choice([3, 3, 3, 4]),
+        }
+        for field, expected in schema["optional"].items():
+            if rng.random() < 0.2:
+                reg[field] = sample_value(expected, rng, field)
+        registers.append(reg)
+        address += DATATYPE_REGISTERS[datatype] + (rng.randint(1, 4) if rng.random() < 0.1 else 0)
+    return registers
+
+
+def canbus_registers(count: int, rng: random.Random) -> list[dict]:
+    registers = []
+    can_id, position = 0x100, 0
+    for i in range(count):
+        datatype = rng.choice(list(DATATYPE_BITS))
+        bits = DATATYPE_BITS[datatype]
+        if position + bits > 64:
+            can_id, position = can_id + 1, 0
+        registers.append({
+            "name": f"signal.value.{i}",
+            "canId": can_id,
+            "startByte": position // 8,
+            "startBit": position % 8,
+            "bitLength": bits,
+            "datatype": datatype,
+            "byteOrder": "little",
+        })
+        position += bits
+    return registers
+
+
+def io_registers(map_type: str, count: int, rng: random.Random) -> list[dict]:
+    registers = [
+        {"name": name, "address": i, "type": direction}
+        for i, (name, direction) in enumerate(REQUIRED_IO_REGISTERS.get(map_type, []))
+    ]
+    for i in range(len(registers), count):
+        registers.append({"name": f"io.channel.{i}", "address": i, "type": rng.choice(["input", "output"])})
+    return registers
+
+
+def address_map(map_type: str, count: int, expression_density: float, error_rate: float, rng: random.Random) -> list[dict]:
+    if map_type == "Modbus TCP/IP":
+        registers = modbus_registers(count, rng)
+    elif map_type == "CANbus":
+        registers = canbus_registers(count, rng)
+    else:
+        registers = io_registers(map_type, count, rng)
+
+    # Expressions reference plain registers and earlier expressions
+    names = [reg["name"] for reg in registers]
+    expressions = []
+    for i in range(int(len(registers) * expression_density)):
+        refs = rng.sample(names + expressions, k=min(2, len(names) + len(expressions)))
+        name = f"calc.value.{i}"
+        registers.append({"name": name, "expression": " + ".join(f"{{{ref}}}" for ref in refs)})
+        expressions.append(name)
+
+    required = addressMapSchemas[map_type]["required"]
+    for reg in registers:
+        if "expression" not in reg and rng.random() < error_rate:
+            inject_error(reg, required, rng, "name")
+    return registers
+
+
+def control_map(registers: list[dict], error_rate: float, rng: random.Random) -> list[dict]:
+    names = [reg["name"] for reg in registers if "expression" not in reg]
+    entries = []
+    for i in range(max(1, len(names) // 10)):
+        read, write = rng.choice(names), rng.choice(names)
+        if rng.random() < error_rate:
+            write = f"missing.command.{i}"
+        entries.append({"name": f"control.{i}", "commands": f"{read}?|{write}={rng.randint(0, 100)}"})
+
+    for entry in entries:
+        if rng.random() < error_rate:
+            inject_error(entry, controlMapSchema, rng, "name")
+    return entries
+
+
+def generate_project(
+    devices: int = 10,
+    registers_per_map: int = 200,
+    expression_density: float = 0.1,
+    shared_map_ratio: float = 0.5,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Project files as {"name", "bytes"} items, the format of
+    helpers.io.read_project_files; address map items also carry their
+    "map_type".
+    """
+    rng = random.Random(seed)
+    files: dict[str, object] = {"config.json": sample_config(configSchema, rng)}
+    map_types: dict[str, str] = {}
+    device_list = []
+    maps_by_type: dict[str, list[tuple[str, str]]] = {}
+
+    types = list(DEVICE_TYPE_WEIGHTS)
+    weights = list(DEVICE_TYPE_WEIGHTS.values())
+
+    for i in range(devices):
+        dtype = rng.choices(types, weights)[0]
+        map_type = DEVICE_MAP_TYPES[dtype]
+        existing = maps_by_type.get(map_type)
+
+        if existing and rng.random() < shared_map_ratio:
+            address_ref, control_ref = rng.choice(existing)
+        else:
+            address_ref = f"{dtype}_{i}_address"
+            control_ref = f"{dtype}_{i}_control" if map_type == "Modbus TCP/IP" else None
+            registers = address_map(map_type, registers_per_map, expression_density, error_rate, rng)
+            files[f"{address_ref}.json"] = registers
+            map_types[f"{address_ref}.json"] = map_type
+            if control_ref is not None:
+                files[f"{control_ref}.json"] = control_map(registers, error_rate, rng)
+            maps_by_type.setdefault(map_type, []).append((address_ref, control_ref))
+
+        schema = deviceSchemas[dtype]
+        device = {
+            field: sample_value(expected, rng, field)
+            for field, expected in schema["required"].items()
+        }
+        device.update({"id": f"{dtype}-{i}", "type": dtype, "addressMap": address_ref, "disabled": False})
+        if "protocol" in device:
+            device["protocol"] = "CANbus" if map_type == "CANbus" else "Modbus TCP/IP"
+        if control_ref is not None:
+            device.update({"ipAddress": f"10.0.{i // 250}.{i % 250}", "port": 502, "slaveId": 1, "controlMap": control_ref})
+        if dtype == "precharge":
+            device["contactorFeedback"] = True
+
+        if rng.random() < error_rate:
+            inject_error(device, schema["required"], rng, "id")
+        device_list.append(device)
+
+    files["devices.json"] = device_list
+
+    items = []
+    for name, payload in sorted(files.items()):
+        item = {"name": name, "bytes": json.dumps(payload, indent=1).encode("utf-8")}
+        if name in map_types:
+            item["map_type"] = map_types[name]
+        items.append(item)
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic project.")
+    parser.add_argument("output", help="Directory to write the project files to")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--registers", type=int, default=200, help="Registers per address map")
+    parser.add_argument("--expression-density", type=float, default=0.1)
+    parser.add_argument("--shared-map-ratio", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    items = generate_project(
+        args.devices, args.registers, args.expression_density, args.shared_map_ratio, args.error_rate, args.seed
+    )
+
+    os.makedirs(args.output, exist_ok=True)
+    for item in items:
+        with open(os.path.join(args.output, item["name"]), "wb") as f:
+            f.write(item["bytes"])
+    print(f"Wrote {len(items)} files to {args.output}")
+
+    map_type_options = [
+        f'--map-type "{item["name"]}={item["map_type"]}"'
+        for item in items
+        if item.get("map_type", "Modbus TCP/IP") != "Modbus TCP/IP"
+    ]
+    if map_type_options:
+        print("Validate with:", " ".join(map_type_options))
+
+
+if __name__ == "__main__":
+    main()
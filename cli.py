@@ -0,0 +1,343 @@
+"""
+Command-line interface for validating PPL project files without Streamlit.
+
+    python cli.py validate <project directory or ZIP> [--jobs N] [--max-errors N | --fail-fast] [--profile]
+    python cli.py classify <project directory or ZIP> [--json]
+    python cli.py diff <old project> <new project> [--json]
+    python cli.py expression-order <address map file> [--json]
+    python cli.py read-plan <Modbus address map file> [--max-gap N] [--json]
+
+Exits with status 1 when any file has errors (for diff: when the new
+version introduces errors).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from helpers.io import ZipLimitError, open_project_source
+from validators.incremental import ResultCache
+from validators.disk_cache import DEFAULT_MAX_BYTES, DiskResultCache, default_cache_path
+from validators.expressions import build_expression_graph, find_expression_cycles, cycle_path, expression_evaluation_order
+from validators.modbus import plan_reads, register_span
+from validators.pipeline import FILE_ROLES, DEFAULT_MAP_TYPE, detect_file_type, validate_source
+from schemas.schemas import addressMapSchemas
+
+
+def _parse_assignments(values: list[str], allowed: list[str], option: str) -> dict[str, str]:
+    assignments: dict[str, str] = {}
+    for value in values:
+        file_name, sep, choice = value.partition("=")
+        if not sep or choice not in allowed:
+            raise SystemExit(f"{option} expects FILE=VALUE with VALUE one of: {', '.join(allowed)}")
+        assignments[file_name] = choice
+    return assignments
+
+
+def print_report(report, quiet: bool = False):
+    for m in report.project.messages:
+        print(f"{m.level}: {m.message}")
+
+    for file_report in report.files:
+        result = file_report.result
+        status = "errors found" if result.has_errors else "valid with warnings" if result.has_warnings else "valid"
+
+        if quiet and not result.has_errors:
+            continue
+
+        kind = file_report.role if file_report.map_type is None else f"{file_report.role}, {file_report.map_type}"
+        if file_report.confidence is not None and file_report.confidence < 1:
+            kind += f", detected {file_report.confidence:.0%}"
+        print(f"{file_report.name} ({kind}): {status}")
+        for m in result.messages:
+            if quiet and m.level != "error" and m.code != "result.truncated":
+                continue
+            print(f"  {m.level}: {m.message}")
+
+    print(f"Revalidated {len(report.revalidated)} of {len(report.files)} files")
+
+    summary = "Errors found" if report.has_errors else "Valid with warnings" if report.has_warnings else "Valid"
+    print(f"Summary: {summary} ({len(report.files)} files)")
+
+
+def print_measurements(report):
+    measurements = sorted(report.measurements(), key=lambda m: m.seconds, reverse=True)
+    print("Performance:")
+    print(f"  {'validator':<32} {'file':<32} {'ms':>9} {'items':>18} {'messages':>9}")
+    for m in measurements:
+        items = f"{m.items} {m.unit}" if m.unit else str(m.items)
+        print(f"  {m.validator:<32} {m.file or '(project)':<32} {m.seconds * 1000:>9.2f} {items:>18} {m.messages:>9}")
+
+
+def export_measurements(report, path: str, project_path: str):
+    """
+    Append the measurements of a run as one JSON line, for trend tracking.
+    """
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "project": project_path,
+        "measurements": [m.to_dict() for m in report.measurements()],
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def open_result_cache(path, max_mb: float):
+    """
+    Persistent result cache at path, or an in-memory one for this run when
+    path is None or the cache file cannot be opened.
+    """
+    if path is None:
+        return ResultCache()
+
+    try:
+        return DiskResultCache(path, max_bytes=int(max_mb * 1024 * 1024))
+    except (OSError, sqlite3.Error) as e:
+        print(f"warning: result cache disabled ({path}: {e})", file=sys.stderr)
+        return ResultCache()
+
+
+def cmd_validate(args) -> int:
+    if not os.path.exists(args.path):
+        print(f"Path not found: {args.path}", file=sys.stderr)
+        return 2
+
+    roles = _parse_assignments(args.role, FILE_ROLES, "--role")
+    map_types = _parse_assignments(args.map_type, list(addressMapSchemas.keys()), "--map-type")
+
+    cache = open_result_cache(args.cache, args.cache_max_mb)
+    instrument = args.profile or args.profile_output is not None
+    last_snapshot = None
+
+    while True:
+        try:
+            with open_project_source(args.path) as source:
+                snapshot = [(name, source.member_hash(name)) for name in source.names]
+                if snapshot != last_snapshot:
+                    reports = validate_source(
+                        source,
+                        roles,
+                        map_types,
+                        args.default_map_type,
+                        detect=args.detect,
+                        jobs=args.jobs,
+                        cache=cache,
+                        max_errors=args.max_errors,
+                        instrument=instrument,
+                    )
+                    for site, report in reports.items():
+                        if len(reports) > 1:
+                            print(f"== Site {site or '(top level)'} ==")
+                        print_report(report, quiet=args.quiet)
+                        if args.profile:
+                            print_measurements(report)
+                        if args.profile_output:
+                            export_measurements(report, args.profile_output, os.path.join(args.path, site) if site else args.path)
+                    has_errors = any(report.has_errors for report in reports.values())
+                    last_snapshot = snapshot
+        except ZipLimitError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+
+        if not args.watch:
+            return 1 if has_errors else 0
+
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 1 if has_errors else 0
+
+
+def cmd_classify(args) -> int:
+    if not os.path.exists(args.path):
+        print(f"Path not found: {args.path}", file=sys.stderr)
+        return 2
+
+    rows = []
+    try:
+        with open_project_source(args.path) as source:
+            for name in source.names:
+                try:
+                    data = json.loads(source.read(name))
+                except ValueError:
+                    rows.append({"name": name, "role": None, "map_type": None, "confidence": 0.0})
+                    continue
+                role, map_type, confidence = detect_file_type(name, data, args.default_map_type)
+                rows.append({"name": name, "role": role, "map_type": map_type, "confidence": confidence})
+    except ZipLimitError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            kind = row["role"] or "(not JSON)" if row["map_type"] is None else f"{row['role']}, {row['map_type']}"
+            print(f"{row['name']}: {kind} ({row['confidence']:.0%})")
+
+    return 0
+
+
+CHANGE_MARKS = {"added": "+", "removed": "-", "modified": "~"}
+
+
+def cmd_diff(args) -> int:
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            print(f"Path not found: {path}", file=sys.stderr)
+            return 2
+
+    from validators.diff import diff_projects
+
+    roles = _parse_assignments(args.role, FILE_ROLES, "--role")
+    map_types = _parse_assignments(args.map_type, list(addressMapSchemas.keys()), "--map-type")
+    try:
+        diff = diff_projects(args.old, args.new, roles, map_types, args.default_map_type)
+    except ZipLimitError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(diff.to_dict(), indent=2))
+        return 1 if diff.has_errors else 0
+
+    for file_diff in diff.files:
+        kind = file_diff.role if file_diff.map_type is None else f"{file_diff.role}, {file_diff.map_type}"
+        print(f"{file_diff.name} ({kind}): {file_diff.change}")
+        for entry in file_diff.entries:
+            print(f"  {CHANGE_MARKS[entry.change]} {entry.key}")
+        for m in file_diff.introduced.messages:
+            print(f"  new {m.level}: {m.message}")
+        for m in file_diff.resolved.messages:
+            print(f"  fixed {m.level}: {m.message}")
+
+    introduced = sum(f.introduced.count("error") for f in diff.files)
+    resolved = sum(f.resolved.count("error") for f in diff.files)
+    print(f"Summary: {len(diff.files)} files changed or affected, {diff.unchanged} unchanged; {introduced} new errors, {resolved} fixed")
+
+    return 1 if diff.has_errors else 0
+
+
+def cmd_expression_order(args) -> int:
+    with open(args.path, "rb") as f:
+        registers = json.load(f)
+
+    expressions = [
+        (reg.get("name"), reg["expression"])
+        for reg in registers
+        if isinstance(reg, dict) and isinstance(reg.get("expression"), str)
+    ]
+    graph = build_expression_graph(expressions)
+    order = expression_evaluation_order(graph)
+
+    if args.json:
+        print(json.dumps(order, indent=2))
+    else:
+        for name in order:
+            print(name)
+
+    cycles = find_expression_cycles(graph)
+    for cycle in cycles:
+        print(f"error: expression cycle {' -> '.join(cycle_path(graph, cycle))}", file=sys.stderr)
+
+    return 1 if cycles else 0
+
+
+def cmd_read_plan(args) -> int:
+    with open(args.path, "rb") as f:
+        registers = json.load(f)
+
+    spans = []
+    multi_read = set()
+    for reg in registers if isinstance(registers, list) else []:
+        span = register_span(reg) if isinstance(reg, dict) else None
+        if span is None:
+            continue
+        spans.append(span)
+        if reg.get("multiRead") is True:
+            multi_read.add(span[3])
+
+    plan = plan_reads(spans, max_gap=args.max_gap, multi_read=multi_read)
+
+    if args.json:
+        print(json.dumps(plan.to_dict(), indent=2))
+        return 0
+
+    after = plan.requests_after
+    for function_code, before in plan.requests_before.items():
+        print(f"Function code {function_code}: {before} -> {after[function_code]} requests per poll")
+        for block in plan.blocks:
+            if block.function_code != function_code:
+                continue
+            unmapped = block.count - block.mapped
+            gaps = f", {unmapped} unmapped" if unmapped else ""
+            print(f"  {block.start}-{block.end - 1} ({block.count}{gaps}): {', '.join(block.names)}")
+
+    print(f"Summary: {sum(plan.requests_before.values())} -> {sum(after.values())} read requests per poll")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Validate PPL configuration files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    validate = subparsers.add_parser("validate", help="Validate a project directory or ZIP archive")
+    validate.add_argument("path", help="Project directory or ZIP archive")
+    validate.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    validate.add_argument("--role", action="append", default=[], metavar="FILE=ROLE", help="Override the guessed file role")
+    validate.add_argument("--map-type", action="append", default=[], metavar="FILE=TYPE", help="Address map type for a file")
+    validate.add_argument("--default-map-type", default=DEFAULT_MAP_TYPE, choices=list(addressMapSchemas.keys()), help=f"Address map type when not given (default: {DEFAULT_MAP_TYPE})")
+    validate.add_argument("--no-detect", dest="detect", action="store_false", help="Guess file roles from file names instead of detecting them from the content")
+    validate.add_argument("--quiet", "-q", action="store_true", help="Only print files with errors")
+    budget = validate.add_mutually_exclusive_group()
+    budget.add_argument("--max-errors", type=int, metavar="N", help="Stop checking a file after N errors")
+    budget.add_argument("--fail-fast", dest="max_errors", action="store_const", const=1, help="Stop checking a file at its first error")
+    validate.add_argument("--profile", action="store_true", help="Print wall time, items processed and messages per validator and file")
+    validate.add_argument("--profile-output", metavar="FILE", help="Append the measurements of each run to FILE as JSON lines")
+    cache = validate.add_mutually_exclusive_group()
+    cache.add_argument("--cache", metavar="FILE", default=default_cache_path(), help="Persistent result cache (default: %(default)s)")
+    cache.add_argument("--no-cache", dest="cache", action="store_const", const=None, help="Do not read or write the persistent result cache")
+    validate.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024), help="Size limit of the result cache, least recently used results are dropped first (default: %(default)g)")
+    validate.add_argument("--watch", action="store_true", help="Keep running and revalidate changed files and their dependents")
+    validate.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds for --watch (default: 2)")
+    validate.set_defaults(func=cmd_validate)
+
+    classify = subparsers.add_parser("classify", help="Print the detected role and address map type of every file")
+    classify.add_argument("path", help="Project directory or ZIP archive")
+    classify.add_argument("--default-map-type", default=DEFAULT_MAP_TYPE, choices=list(addressMapSchemas.keys()), help=f"Address map type when detection is not confident (default: {DEFAULT_MAP_TYPE})")
+    classify.add_argument("--json", action="store_true", help="Print the classifications as JSON")
+    classify.set_defaults(func=cmd_classify)
+
+    diff = subparsers.add_parser("diff", help="Validate only what changed between two versions of a project")
+    diff.add_argument("old", help="Previous project directory or ZIP archive")
+    diff.add_argument("new", help="New project directory or ZIP archive")
+    diff.add_argument("--role", action="append", default=[], metavar="FILE=ROLE", help="Override the detected file role")
+    diff.add_argument("--map-type", action="append", default=[], metavar="FILE=TYPE", help="Address map type for a file")
+    diff.add_argument("--default-map-type", default=DEFAULT_MAP_TYPE, choices=list(addressMapSchemas.keys()), help=f"Address map type when not detected (default: {DEFAULT_MAP_TYPE})")
+    diff.add_argument("--json", action="store_true", help="Print the diff as JSON")
+    diff.set_defaults(func=cmd_diff)
+
+    expression_order = subparsers.add_parser("expression-order", help="Print the evaluation order of an address map's expression registers")
+    expression_order.add_argument("path", help="Address map JSON file")
+    expression_order.add_argument("--json", action="store_true", help="Print the order as a JSON array")
+    expression_order.set_defaults(func=cmd_expression_order)
+
+    read_plan = subparsers.add_parser("read-plan", help="Coalesce a Modbus address map's registers into block reads")
+    read_plan.add_argument("path", help="Modbus TCP/IP address map JSON file")
+    read_plan.add_argument("--max-gap", type=int, default=0, metavar="N", help="Unmapped addresses a block may read across between two registers (default: 0)")
+    read_plan.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    read_plan.set_defaults(func=cmd_read_plan)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
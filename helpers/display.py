@@ -0,0 +1,160 @@
+"""
+Streamlit rendering of validation results.
+
+Messages are shown as one paginated table (or a page of collapsible per-file
+groups) instead of one Streamlit element per message, so the number of
+elements on the page stays bounded however many messages a project produces.
+Filtering works on the stored codes and arguments; message text is only
+formatted for search and for the rows that are actually displayed.
+"""
+
+import math
+
+import streamlit as st
+
+from validators.messages import format_message, message_subject
+from validators.result import LEVELS, ValidationResult
+
+PAGE_SIZES = (25, 50, 100, 250)
+FILES_PER_PAGE = 20
+LEVEL_ICONS = {"error": "❌", "warning": "⚠", "info": "ℹ", "success": "✔"}
+
+# (group index, level, code, args)
+Entry = tuple[int, str, str, tuple]
+
+
+def render_status(result: ValidationResult):
+    if not result.has_errors:
+        if result.has_warnings:
+            st.warning("Valid with warnings ⚠")
+        else:
+            st.success("Valid ✔")
+    else:
+        st.error("Errors found ❌")
+
+
+def _status_icon(result: ValidationResult) -> str:
+    if result.has_errors:
+        return LEVEL_ICONS["error"]
+    if result.has_warnings:
+        return LEVEL_ICONS["warning"]
+    return LEVEL_ICONS["success"]
+
+
+def _row(groups: list[tuple[str, ValidationResult]], entry: Entry, with_file: bool) -> dict:
+    group, level, code, args = entry
+    subject = message_subject(code, args)
+    row = {"File": groups[group][0]} if with_file else {}
+    row.update({
+        "Level": f"{LEVEL_ICONS[level]} {level}",
+        "Register": "" if subject is None else str(subject),
+        "Message": format_message(code, args),
+        "Code": code,
+    })
+    return row
+
+
+def _paginate(total: int, page_size: int, key: str) -> tuple[int, int]:
+    pages = max(1, math.ceil(total / page_size))
+    if pages == 1:
+        return 0, total
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=key)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
+
+
+def _filter_entries(groups: list[tuple[str, ValidationResult]], key: str) -> tuple[list[Entry], int]:
+    counts = {level: 0 for level in LEVELS}
+    codes = set()
+    for _, result in groups:
+        for level, n in result.counts.items():
+            counts[level] += n
+        codes.update(code for _, code, _ in result.iter_entries())
+
+    present = [level for level in LEVELS if counts[level]]
+    st.caption(" · ".join(f"{LEVEL_ICONS[level]} {counts[level]} {level}" for level in present) or "No messages")
+
+    cols = st.columns([2, 2, 3, 1] if len(groups) > 1 else [2, 3, 3, 1])
+    levels = cols[0].multiselect(
+        "Level", present, default=present, key=f"{key}_levels",
+        format_func=lambda level: f"{LEVEL_ICONS[level]} {level}",
+    )
+    selected_codes = cols[1].multiselect("Message code", sorted(codes), key=f"{key}_codes")
+    search = cols[2].text_input("Search", placeholder="Register, device or message text", key=f"{key}_search")
+    page_size = cols[3].selectbox("Rows", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    group_ids = range(len(groups))
+    if len(groups) > 1:
+        names = [name for name, _ in groups]
+        selected_files = st.multiselect("Files", names, key=f"{key}_files")
+        if selected_files:
+            wanted = set(selected_files)
+            group_ids = [i for i, name in enumerate(names) if name in wanted]
+
+    levels = set(levels)
+    selected_codes = set(selected_codes)
+    needle = search.strip().lower()
+
+    entries = []
+    for group in group_ids:
+        for level, code, args in groups[group][1].iter_entries():
+            if level not in levels:
+                continue
+            if selected_codes and code not in selected_codes:
+                continue
+            if needle and needle not in format_message(code, args).lower():
+                continue
+            entries.append((group, level, code, args))
+
+    return entries, page_size
+
+
+def render_results(groups: list[tuple[str, ValidationResult]], key: str, grouped: bool = False):
+    """
+    Render the messages of one or more (file name, result) pairs.
+
+    With grouped=True every file gets a collapsible section (a page of
+    FILES_PER_PAGE files at a time) showing its status and its first
+    page of matching messages; otherwise all matching messages go into a
+    single paginated table.
+    """
+    entries, page_size = _filter_entries(groups, key)
+
+    if not grouped:
+        if not entries:
+            st.info("No messages match the filters")
+            return
+        start, end = _paginate(len(entries), page_size, f"{key}_page")
+        rows = [_row(groups, entry, len(groups) > 1) for entry in entries[start:end]]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f"Showing {start + 1}-{end} of {len(entries)} messages")
+        return
+
+    by_group: dict[int, list[Entry]] = {}
+    for entry in entries:
+        by_group.setdefault(entry[0], []).append(entry)
+
+    # Files with errors first, then warnings, keeping upload order otherwise
+    order = sorted(range(len(groups)), key=lambda i: (not groups[i][1].has_errors, not groups[i][1].has_warnings))
+    start, end = _paginate(len(order), FILES_PER_PAGE, f"{key}_file_page")
+
+    for group in order[start:end]:
+        name, result = groups[group]
+        group_entries = by_group.get(group, [])
+        counts = ", ".join(f"{n} {level}" for level, n in result.counts.items() if n)
+        label = f"{_status_icon(result)} {name}" + (f" ({counts})" if counts else "")
+
+        with st.expander(label, expanded=result.has_errors and len(order) == 1):
+            if not group_entries:
+                st.caption("No messages match the filters" if result.total else "No messages")
+                continue
+            shown = group_entries[:page_size]
+            st.dataframe([_row(groups, entry, False) for entry in shown], hide_index=True, use_container_width=True)
+            if len(group_entries) > len(shown):
+                st.caption(
+                    f"Showing the first {len(shown)} of {len(group_entries)} messages; "
+                    "narrow the filters or switch to the table view to see the rest"
+                )
+
+    if len(order) > FILES_PER_PAGE:
+        st.caption(f"Showing files {start + 1}-{end} of {len(order)}")
@@ -0,0 +1,359 @@
+import codecs
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+# A decode error this close to the end of the buffer may only mean the
+# element is cut off (a partial literal or \u escape)
+_TRUNCATION_MARGIN = 6
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def canonical_hash(data: Any) -> str:
+    """
+    Hash of a parsed JSON payload that ignores formatting and object key
+    order, so semantically identical files hash the same.
+    """
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def iter_json_array(stream: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Incrementally decode a top-level JSON array from a binary stream,
+    yielding one element at a time. Only the undecoded tail of the input
+    is buffered, never the whole document.
+    Raises ValueError (json.JSONDecodeError) on malformed input, with the
+    position in the whole document.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pos = 0
+    eof = False
+    # Characters, newlines and characters after the last newline dropped
+    # from the front of the buffer
+    dropped = dropped_lines = dropped_column = 0
+
+    def fill(size: int = chunk_size) -> bool:
+        nonlocal buffer, pos, eof, dropped, dropped_lines, dropped_column
+        if eof:
+            return False
+        if pos:
+            head = buffer[:pos]
+            newlines = head.count("\n")
+            dropped_column = pos - head.rfind("\n") - 1 if newlines else dropped_column + pos
+            dropped_lines += newlines
+            dropped += pos
+        chunk = stream.read(size)
+        if not chunk:
+            eof = True
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        return True
+
+    def error(msg: str, at: int) -> json.JSONDecodeError:
+        e = json.JSONDecodeError(msg, buffer, at)
+        if e.lineno == 1:
+            e.colno += dropped_column
+        e.lineno += dropped_lines
+        e.pos += dropped
+        e.args = (f"{msg}: line {e.lineno} column {e.colno} (char {e.pos})",)
+        return e
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    if next_char() != "[":
+        raise error("Expected a top-level JSON array", pos)
+    pos += 1
+
+    if next_char() == "]":
+        pos += 1
+    else:
+        while True:
+            next_char()
+            # Grows while one element spans many chunks, so it is not
+            # re-decoded from its start for every chunk
+            read_size = chunk_size
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    truncated = e.pos >= len(buffer) - _TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+                    if truncated and fill(read_size):
+                        read_size *= 2
+                        continue
+                    raise error(e.msg, e.pos) from None
+                # A number may continue past the end of the buffer ("12" of
+                # "12.5"); read on until something else follows it.
+                if isinstance(item, (int, float)) and not isinstance(item, bool):
+                    tail = end
+                    while tail < len(buffer) and buffer[tail] in _NUMBER_CHARS:
+                        tail += 1
+                    if tail == len(buffer) and fill(read_size):
+                        read_size *= 2
+                        continue
+                break
+            pos = end
+            yield item
+
+            separator = next_char()
+            if separator == ",":
+                pos += 1
+            elif separator == "]":
+                pos += 1
+                break
+            else:
+                raise error("Expected ',' or ']' after array element", pos)
+
+    if next_char() != "":
+        raise error("Extra data after top-level array", pos)
+
+
+class ParseCache:
+    """
+    Content-hash keyed cache of parsed JSON file bodies.
+
+    Each unique body is decoded once; identical uploads (or the same upload
+    across Streamlit reruns) share the parsed object. Entries are evicted in
+    least-recently-used order once the summed size of the cached bodies
+    exceeds max_bytes. Parsed objects are shared, callers must not mutate them.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, tuple[Any, Optional[str], int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def parse(self, body: bytes, key: Optional[str] = None) -> tuple[Any, Optional[str]]:
+        """
+        Return (data, error) for a JSON body. error is None on success.
+        """
+        if key is None:
+            key = content_hash(body)
+        return self.get_or_parse(key, lambda: body)
+
+    def get_or_parse(self, key: str, read: Callable[[], bytes]) -> tuple[Any, Optional[str]]:
+        """
+        Like parse, but the body is only read (by calling read) on a cache
+        miss, so cached ZIP members are not decompressed again.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+        body = read()
+        try:
+            data, error = json.loads(body.decode("utf-8")), None
+        except Exception as e:
+            data, error = None, str(e)
+
+        size = len(body)
+        self._entries[key] = (data, error, size)
+        self.total_bytes += size
+        self._evict()
+
+        return data, error
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the limit.
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+
+
+DEFAULT_MAX_MEMBER_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 1024 * 1024 * 1024
+
+
+class ZipLimitError(ValueError):
+    pass
+
+
+class ZipSource:
+    """
+    The .json members of a ZIP archive, read one at a time on demand.
+
+    Member names keep their folder paths. Decompressed sizes are enforced
+    while reading (the sizes in the archive headers are not trusted): a
+    member may not exceed max_member_bytes, and all reads together may not
+    exceed max_total_bytes. Either raises ZipLimitError.
+    """
+
+    def __init__(
+        self,
+        source,
+        max_member_bytes: int = DEFAULT_MAX_MEMBER_BYTES,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+    ):
+        import zipfile  # only needed for archives, kept off the import path of plain validation
+
+        self.max_member_bytes = max_member_bytes
+        self.max_total_bytes = max_total_bytes
+        self.total_read = 0
+        self._zip = zipfile.ZipFile(source)
+        self._infos = {
+            info.filename: info
+            for info in self._zip.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(".json")
+        }
+        self.names = sorted(self._infos)
+
+    def member_hash(self, name: str) -> str:
+        """
+        Change-detection key from the archive's CRC-32 and size, available
+        without decompressing the member.
+        """
+        info = self._infos[name]
+        return f"zip:{info.CRC:08x}:{info.file_size}"
+
+    def size(self, name: str) -> int:
+        return self._infos[name].file_size
+
+    def read(self, name: str) -> bytes:
+        info = self._infos[name]
+        if info.file_size > self.max_member_bytes:
+            raise ZipLimitError(f"{name}: {info.file_size} bytes exceeds the {self.max_member_bytes} byte member limit")
+
+        chunks = []
+        size = 0
+        with self._zip.open(info) as f:
+            while True:
+                chunk = f.read(1024 * 1024)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_member_bytes:
+                    raise ZipLimitError(f"{name}: decompresses past the {self.max_member_bytes} byte member limit")
+                if self.total_read + size > self.max_total_bytes:
+                    raise ZipLimitError(f"Archive decompresses past the {self.max_total_bytes} byte total limit")
+                chunks.append(chunk)
+
+        self.total_read += size
+        return b"".join(chunks)
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirectorySource:
+    """
+    The .json files below a directory, with the same interface as ZipSource.
+    Names are paths relative to the directory, with "/" separators.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names = sorted(
+            os.path.relpath(os.path.join(root, file_name), path).replace(os.sep, "/")
+            for root, _, files in os.walk(path)
+            for file_name in files
+            if file_name.lower().endswith(".json")
+        )
+
+    def member_hash(self, name: str) -> str:
+        stat = os.stat(os.path.join(self.path, name))
+        return f"file:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def size(self, name: str) -> int:
+        return os.path.getsize(os.path.join(self.path, name))
+
+    def read(self, name: str) -> bytes:
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemorySource:
+    """
+    Already loaded {"name", "bytes"} items, with the same interface as ZipSource.
+    """
+
+    def __init__(self, items: list[dict]):
+        self._bodies = {item["name"]: item["bytes"] for item in items}
+        self.names = sorted(self._bodies)
+
+    def member_hash(self, name: str) -> str:
+        return content_hash(self._bodies[name])
+
+    def size(self, name: str) -> int:
+        return len(self._bodies[name])
+
+    def read(self, name: str) -> bytes:
+        return self._bodies[name]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_project_source(path: str, **limits):
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    return ZipSource(path, **limits)
+
+
+def read_project_files(path: str, names: Optional[list[str]] = None) -> list[dict]:
+    """
+    Read the .json files of a project directory or ZIP archive (all of them,
+    or only names). Returns a list of {"name", "bytes"} items, names keeping
+    their folder paths.
+    """
+    with open_project_source(path) as source:
+        return [{"name": name, "bytes": source.read(name)} for name in (source.names if names is None else names)]
+
+
+def read_zip_files(source, **limits) -> list[dict]:
+    """
+    Read every .json member of a ZIP archive, given as a path or a binary
+    file object, within the ZipSource size limits.
+    """
+    with ZipSource(source, **limits) as zip_source:
+        return [{"name": name, "bytes": zip_source.read(name)} for name in zip_source.names]
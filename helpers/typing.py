@@ -7,7 +7,7 @@ def expectedTypeToString(expectedType):
     if isinstance(expectedType, tuple):
         return ", ".join([type.__name__ for type in expectedType])
     elif isinstance(expectedType, list):
-        return ", ".join([type for type in expectedType])
+        return ", ".join([str(type) for type in expectedType])
     else:
         return expectedType.__name__
 
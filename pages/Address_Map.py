@@ -1,6 +1,7 @@
-import streamlit as st, json
-from validators.address_map import validate_address_map
+import streamlit as st
+from validators.address_map import validate_address_map_stream
 from schemas.schemas import addressMapSchemas
+from helpers.display import render_results, render_status
 
 
 st.title("Address Map Validator")
@@ -17,23 +18,27 @@ The validator will check:
 - The file is valid JSON
 - The structure matches the selected map type schema
 - Required fields are present and values have the expected types
+- For Modbus TCP/IP maps, register address ranges do not overlap within a function code
+- For CANbus maps, signals do not share bits within a frame or run past byte 7
 """
 )
 
 file = st.file_uploader("Upload address_map.json", type="json")
 map_type = st.selectbox("Map type", list(addressMapSchemas.keys()))
 
+include_summary = False
+if map_type == "Modbus TCP/IP":
+    include_summary = st.checkbox("Show register gaps and read plan summary", help="List unmapped address ranges and read requests per poll per function code")
+elif map_type == "CANbus":
+    include_summary = st.checkbox("Show frame utilization report", help="Bits used and signal count per CAN id")
+
 if file and st.button("Validate", type="primary"):
-    data = json.load(file)
-    result = validate_address_map(data, map_type)
-
-    for m in result.messages:
-        getattr(st, m.level)(m.message)
-
-    if not result.has_errors:
-        if result.has_warnings:
-            st.warning("Valid with warnings ⚠")
-        else:
-            st.success("Valid ✔")
-    else:
-        st.error("Errors found ❌")
\ No newline at end of file
+    result = validate_address_map_stream(file, map_type, include_summary=include_summary)
+    st.session_state.address_map_result = ((file.file_id, map_type, include_summary), result)
+
+# Kept across reruns so the result table can be filtered and paged
+stored = st.session_state.get("address_map_result")
+if file and stored and stored[0] == (file.file_id, map_type, include_summary):
+    result = stored[1]
+    render_results([(file.name, result)], key="address_map")
+    render_status(result)
@@ -1,5 +1,6 @@
 import streamlit as st, json
 from validators.config import validate_config
+from helpers.display import render_results, render_status
 
 
 st.title("Config File Validator")
@@ -22,15 +23,10 @@ file = st.file_uploader("Upload config.json", type="json")
 
 if file and st.button("Validate", type="primary"):
     data = json.load(file)
-    result = validate_config(data)
-
-    for m in result.messages:
-        getattr(st, m.level)(m.message)
-
-    if not result.has_errors:
-        if result.has_warnings:
-            st.warning("Valid with warnings ⚠")
-        else:
-            st.success("Valid ✔")
-    else:
-        st.error("Errors found ❌")
+    st.session_state.config_result = (file.file_id, validate_config(data))
+
+stored = st.session_state.get("config_result")
+if file and stored and stored[0] == file.file_id:
+    result = stored[1]
+    render_results([(file.name, result)], key="config")
+    render_status(result)
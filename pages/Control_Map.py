@@ -1,5 +1,6 @@
 import streamlit as st, json
 from validators.control_map import validate_control_maps
+from helpers.display import render_results, render_status
 
 
 st.title("Control Map Validator")
@@ -22,15 +23,10 @@ file = st.file_uploader("Upload control_map.json", type="json")
 
 if file and st.button("Validate", type="primary"):
     data = json.load(file)
-    result = validate_control_maps(data)
-
-    for m in result.messages:
-        getattr(st, m.level)(m.message)
-
-    if not result.has_errors:
-        if result.has_warnings:
-            st.warning("Valid with warnings ⚠")
-        else:
-            st.success("Valid ✔")
-    else:
-        st.error("Errors found ❌")
+    st.session_state.control_map_result = (file.file_id, validate_control_maps(data))
+
+stored = st.session_state.get("control_map_result")
+if file and stored and stored[0] == file.file_id:
+    result = stored[1]
+    render_results([(file.name, result)], key="control_map")
+    render_status(result)
@@ -1,5 +1,6 @@
 import streamlit as st, json
 from validators.devices import validate_devices
+from helpers.display import render_results, render_status
 
 
 st.title("Devices File Validator")
@@ -22,15 +23,10 @@ file = st.file_uploader("Upload devices.json", type="json")
 
 if file and st.button("Validate", type="primary"):
     devices = json.load(file)
-    result = validate_devices(devices)
-
-    for m in result.messages:
-        getattr(st, m.level)(m.message)
-
-    if not result.has_errors:
-        if result.has_warnings:
-            st.warning("Valid with warnings ⚠")
-        else:
-            st.success("Valid ✔")
-    else:
-        st.error("Errors found ❌")
\ No newline at end of file
+    st.session_state.devices_result = (file.file_id, validate_devices(devices))
+
+stored = st.session_state.get("devices_result")
+if file and stored and stored[0] == file.file_id:
+    result = stored[1]
+    render_results([(file.name, result)], key="devices")
+    render_status(result)
@@ -1,11 +1,11 @@
-import streamlit as st, json, zipfile
-import os
-from validators.project import find_missing_device_references, validate_control_map_commands
-from validators.result import merge_validation_results
-from validators.address_map import validate_address_map, get_precharge_contactor_feedback
-from validators.control_map import validate_control_maps
-from validators.devices import validate_devices
-from validators.config import validate_config
+import streamlit as st
+import json, sqlite3, time
+from functools import partial
+from helpers.io import ParseCache, ZipLimitError, ZipSource, content_hash
+from helpers.display import render_results
+from validators.incremental import ResultCache
+from validators.disk_cache import DiskResultCache
+from validators.pipeline import FILE_ROLES, DEFAULT_MAP_TYPE, MIN_CONFIDENCE, detect_file_type, group_sites, guess_role, validate_project
 from schemas.schemas import addressMapSchemas
 
 
@@ -17,7 +17,7 @@ st.markdown(
 
 You can validate an entire project by uploading either:
 
-- A **ZIP** that contains your project JSON files, or
+- A **ZIP** that contains your project JSON files (a ZIP with several sites, each in its own folder with a `devices.json`, is validated site by site), or
 - Multiple **JSON** files directly.
 
 After uploading, you must **classify each file** so the validator knows what it is:
@@ -33,6 +33,35 @@ The validator will check each file’s schema and also perform some cross-file c
 if "full_project_uploaders_nonce" not in st.session_state:
     st.session_state.full_project_uploaders_nonce = 0
 
+if "full_project_parse_cache" not in st.session_state:
+    st.session_state.full_project_parse_cache = ParseCache()
+
+# ZIP members are looked up in the parse cache by their CRC-32 and size, which
+# is cheap but forgeable; the shared result cache gets a sha256 of the bytes
+if "full_project_member_hashes" not in st.session_state:
+    st.session_state.full_project_member_hashes = {}
+
+
+@st.cache_resource
+def open_result_cache():
+    # Shared by every session; results are keyed on file name and content,
+    # so sessions never see each other's files
+    try:
+        return DiskResultCache()
+    except (OSError, sqlite3.Error):
+        return ResultCache()
+
+
+parse_cache: ParseCache = st.session_state.full_project_parse_cache
+member_hashes: dict[str, str] = st.session_state.full_project_member_hashes
+result_cache = open_result_cache()
+
+
+def read_member(source: ZipSource, name: str) -> bytes:
+    body = source.read(name)
+    member_hashes[source.member_hash(name)] = content_hash(body)
+    return body
+
 zip_file = st.file_uploader(
     "Upload folder as ZIP (optional)",
     type="zip",
@@ -48,142 +77,171 @@ json_files = st.file_uploader(
 if zip_file is not None or json_files:
     if st.button("Remove all uploaded files"):
         st.session_state.full_project_uploaders_nonce += 1
+        parse_cache.clear()
+        member_hashes.clear()
+        st.session_state.pop("full_project_reports", None)
         st.rerun()
 
+# Files are listed up front but only read (and, for ZIP members, decompressed
+# within the ZipSource size limits) when their parsed form is not cached yet.
 items: list[dict] = []
 
 if zip_file is not None:
     try:
-        z = zipfile.ZipFile(zip_file)
-        for name in z.namelist():
-            if name.lower().endswith(".json") and not name.endswith("/"):
-                display_name = os.path.basename(name)
-                items.append({"name": display_name, "bytes": z.read(name)})
+        zip_source = ZipSource(zip_file)
+        for name in zip_source.names:
+            items.append({
+                "name": name,
+                "hash": zip_source.member_hash(name),
+                "size": zip_source.size(name),
+                "read": partial(read_member, zip_source, name),
+            })
     except Exception as e:
         st.error(f"Could not read ZIP: {e}")
 
 if json_files:
     for f in json_files:
         try:
-            items.append({"name": getattr(f, "name", "(uploaded).json"), "bytes": f.getvalue()})
+            body = f.getvalue()
+            body_hash = content_hash(body)
+            items.append({
+                "name": getattr(f, "name", "(uploaded).json"),
+                "hash": body_hash,
+                "content_hash": body_hash,
+                "size": len(body),
+                "read": partial(bytes, body),
+            })
         except Exception as e:
             st.error(f"Could not read uploaded file: {e}")
 
 if items:
+    parsed: list[tuple] = []
+    for item in items:
+        start = time.perf_counter()
+        try:
+            data, parse_error = parse_cache.get_or_parse(item["hash"], item["read"])
+            if "content_hash" not in item:
+                if item["hash"] not in member_hashes:
+                    item["read"]()
+                item["content_hash"] = member_hashes[item["hash"]]
+        except ZipLimitError as e:
+            st.error(f"ZIP rejected: {e}")
+            st.stop()
+        parsed.append((data, parse_error, time.perf_counter() - start))
+
     st.subheader("Assign File Types")
+    st.caption("Preselected from the file contents, change them where the detection is wrong.")
 
     selections: list[dict] = []
     map_types = list(addressMapSchemas.keys())
 
-    for idx, item in enumerate(items):
+    for idx, (item, (data, parse_error, parse_seconds)) in enumerate(zip(items, parsed)):
         name = item["name"]
-        default_role = "Config" if name == "config.json" else "Devices" if name == "devices.json" else "Control Map" if "control" in name else "Address Map" if "address" in name else "Address Map"
+        if parse_error is None:
+            default_role, default_map_type, confidence = detect_file_type(name, data)
+        else:
+            default_role, default_map_type, confidence = guess_role(name), DEFAULT_MAP_TYPE, 0.0
 
         with st.container():
-            st.markdown(f"**{name}**")
+            st.markdown(f"**{name}**" if confidence >= MIN_CONFIDENCE else f"**{name}** (detection uncertain, {confidence:.0%})")
             role = st.selectbox(
                 "File type",
-                ["Config", "Devices", "Address Map", "Control Map"],
-                index=0 if default_role == "Config" else 1 if default_role == "Devices" else 3 if default_role == "Control Map" else 2,
+                FILE_ROLES,
+                index=FILE_ROLES.index(default_role),
                 key=f"role_{idx}_{name}",
             )
 
             map_type = None
             if role == "Address Map":
+                default_map_type = default_map_type or DEFAULT_MAP_TYPE
                 map_type = st.selectbox(
                     "Map type",
                     map_types,
-                    index=0 if "Modbus TCP/IP" not in map_types else map_types.index("Modbus TCP/IP"),
+                    index=map_types.index(default_map_type) if default_map_type in map_types else 0,
                     key=f"maptype_{idx}_{name}",
                 )
 
-            selections.append({"name": name, "bytes": item["bytes"], "role": role, "map_type": map_type})
+            selections.append({
+                "name": name,
+                "hash": item["content_hash"],
+                "size": item["size"],
+                "role": role,
+                "map_type": map_type,
+                "data": data,
+                "parse_error": parse_error,
+                "parse_seconds": parse_seconds,
+            })
+
+    max_errors = st.number_input(
+        "Stop checking a file after this many errors (0 = no limit)",
+        min_value=0,
+        value=100,
+        step=10,
+        help="Files that hit the limit return early with a notice; use 1 to stop at the first error per file",
+    )
+
+    instrument = st.checkbox("Record performance metrics", help="Time every validator per file and show the results under Performance")
 
     if st.button("Validate All Files", type="primary"):
+        # Archives with several sites (folders holding a devices.json) are validated site by site
+        by_name = {sel["name"]: sel for sel in selections}
+        st.session_state.full_project_reports = {
+            site: validate_project(
+                [by_name[name] for name in names],
+                cache=result_cache,
+                max_errors=max_errors or None,
+                instrument=instrument,
+            )
+            for site, names in group_sites(list(by_name)).items()
+        }
+
+    # Kept across reruns so the result view can be filtered and paged
+    reports = st.session_state.get("full_project_reports")
+    if reports:
         st.subheader("Validation Results")
-        any_errors = False
-        any_warnings = False
-
-        available_files = {os.path.basename(s["name"]) for s in selections}
-
-        parsed_by_file: dict[str, object] = {}
-        address_maps_by_file: dict[str, object] = {}
-        devices_payload = None
-
-        device_files = [s for s in selections if s["role"] == "Devices"]
-        if len(device_files) == 0:
-            st.error("No devices file selected"); any_errors = True
-        elif len(device_files) > 1:
-            st.error("Multiple devices files selected"); any_errors = True
-
-        config_files = [s for s in selections if s["role"] == "Config"]
-        if len(config_files) == 0:
-            st.error("No config file selected"); any_errors = True
-        elif len(config_files) > 1:
-            st.error("Multiple config files selected"); any_errors = True
-
-        for sel in selections:
-            file_key = os.path.basename(sel["name"])
-            try:
-                parsed_by_file[file_key] = json.loads(sel["bytes"].decode("utf-8"))
-            except Exception:
-                continue
-
-            if sel["role"] == "Devices":
-                devices_payload = parsed_by_file[file_key]
-            elif sel["role"] == "Address Map":
-                address_maps_by_file[file_key] = parsed_by_file[file_key]
-
-        for sel in selections:
-            st.markdown(f"**{sel['name']}**")
-            try:
-                data = json.loads(sel["bytes"].decode("utf-8"))
-            except Exception as e:
-                st.error(f"Invalid JSON: {e}")
-                any_errors = True
-                continue
-
-            if sel["role"] == "Devices":
-                devices_result = validate_devices(data)
-                refs_result = find_missing_device_references(data, available_files)
-                result = merge_validation_results(devices_result, refs_result)
-            elif sel["role"] == "Config":
-                result = validate_config(data)
-            elif sel["role"] == "Control Map":
-                base_result = validate_control_maps(data)
-                cross_result = validate_control_map_commands(
-                    control_map_file=sel["name"],
-                    control_map=data,
-                    devices=devices_payload,
-                    address_maps_by_file=address_maps_by_file,
+
+        files = [file_report for report in reports.values() for file_report in report.files]
+        revalidated = [name for report in reports.values() for name in report.revalidated]
+        if len(revalidated) == len(files):
+            st.caption(f"Validated all {len(files)} files" + (f" in {len(reports)} sites" if len(reports) > 1 else ""))
+        else:
+            st.caption(f"Revalidated {len(revalidated)} of {len(files)} files (others unchanged): {', '.join(revalidated) or 'none'}")
+
+        groups = []
+        for site, report in reports.items():
+            if report.project.total:
+                groups.append((f"{site}/ (project)" if site else "(project)", report.project))
+            groups.extend((file_report.name, file_report.result) for file_report in report.files)
+
+        view = st.radio("View", ["By file", "Table"], horizontal=True, key="full_project_view")
+        render_results(groups, key="full_project", grouped=view == "By file")
+
+        measurements = [m for report in reports.values() for m in report.measurements()]
+        if measurements:
+            with st.expander("Performance"):
+                rows = [
+                    {
+                        "Validator": m.validator,
+                        "File": m.file or "(project)",
+                        "Time (ms)": round(m.seconds * 1000, 2),
+                        "Items": m.items,
+                        "Unit": m.unit,
+                        "Messages": m.messages,
+                    }
+                    for m in sorted(measurements, key=lambda m: m.seconds, reverse=True)
+                ]
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+                st.download_button(
+                    "Download measurements (JSON)",
+                    json.dumps([m.to_dict() for m in measurements], indent=2),
+                    file_name="validation_measurements.json",
+                    mime="application/json",
                 )
-                result = merge_validation_results(base_result, cross_result)
-            else:
-                if sel["map_type"] == "Precharge" and isinstance(devices_payload, list):
-                    address_map_file = os.path.basename(sel["name"])
-                    precharge_contactor_feedback = get_precharge_contactor_feedback(devices_payload, address_map_file)
-                    result = validate_address_map(data, sel["map_type"], precharge_contactor_feedback)
-                else:
-                    result = validate_address_map(data, sel["map_type"])
-
-            for m in result.messages:
-                getattr(st, m.level)(m.message)
-
-            if not result.has_errors:
-                if result.has_warnings:
-                    st.warning("Valid with warnings ⚠")
-                    any_warnings = True
-                else:
-                    st.success("Valid ✔")
-            else:
-                st.error("Errors found ❌")
-                any_errors = True
-                any_warnings = any_warnings or result.has_warnings
 
         st.subheader("Validation Summary")
-        if any_errors:
+        if any(report.has_errors for report in reports.values()):
             st.error("Errors found ❌")
-        elif any_warnings:
+        elif any(report.has_warnings for report in reports.values()):
             st.warning("Valid with warnings ⚠")
         else:
-            st.success("Valid ✔")
\ No newline at end of file
+            st.success("Valid ✔")
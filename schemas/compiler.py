@@ -0,0 +1,124 @@
+"""
+Compiles the schema dictionaries from schemas.schemas into immutable
+validation plans.
+
+A plan is built once per map type / device type and cached, so validators
+no longer re-walk the raw schema dicts for every register or device.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from schemas.schemas import addressMapSchemas, deviceSchemas
+from helpers.typing import expectedTypeToString
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """
+    Type check for a single schema field, with its message codes resolved.
+    """
+    field: str
+    types: Optional[tuple]          # isinstance() check, None for enum fields
+    choices: Optional[frozenset]    # allowed values, None for typed fields
+    expected: str                   # human readable expected type
+    missing_code: str               # message codes, see validators.messages
+    type_code: str
+
+    def accepts(self, value) -> bool:
+        if self.choices is not None:
+            try:
+                return value in self.choices
+            except TypeError:
+                # unhashable values (lists, dicts) can never be enum members
+                return False
+        return isinstance(value, self.types)
+
+
+@dataclass(frozen=True)
+class ConstraintRule:
+    """
+    Numeric range check for a single schema field.
+    """
+    field: str
+    minimum: Optional[float]
+    maximum: Optional[float]
+    code: str
+
+    def accepts(self, value) -> bool:
+        if self.minimum is not None and value < self.minimum:
+            return False
+        if self.maximum is not None and value > self.maximum:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class SchemaPlan:
+    """
+    Precompiled validation plan for one address map type or device type.
+    """
+    name: str
+    required: tuple[FieldRule, ...]
+    optional: tuple[FieldRule, ...]
+    constraints: tuple[ConstraintRule, ...]
+    allowed_keys: frozenset[str]
+    unknown_code: str
+
+
+def _compile_rule(subject: str, field: str, expected, optional: bool) -> FieldRule:
+    expected_str = expectedTypeToString(expected)
+
+    if isinstance(expected, list):
+        types, choices = None, frozenset(expected)
+    else:
+        types = expected if isinstance(expected, tuple) else (expected,)
+        choices = None
+
+    return FieldRule(
+        field=field,
+        types=types,
+        choices=choices,
+        expected=expected_str,
+        missing_code=f"{subject}.missing_field",
+        type_code=f"{subject}.optional_field_type" if optional else f"{subject}.field_type",
+    )
+
+
+def _compile_constraint(subject: str, field: str, rule: dict) -> ConstraintRule:
+    return ConstraintRule(
+        field=field,
+        minimum=rule.get("min"),
+        maximum=rule.get("max"),
+        code=f"{subject}.out_of_range",
+    )
+
+
+def compile_schema(name: str, schema: dict, subject: str) -> SchemaPlan:
+    required = schema.get("required", {})
+    optional = schema.get("optional", {})
+    constraints = schema.get("constraints", {})
+
+    return SchemaPlan(
+        name=name,
+        required=tuple(_compile_rule(subject, f, e, False) for f, e in required.items()),
+        optional=tuple(_compile_rule(subject, f, e, True) for f, e in optional.items()),
+        constraints=tuple(_compile_constraint(subject, f, r) for f, r in constraints.items()),
+        allowed_keys=frozenset(required) | frozenset(optional),
+        unknown_code=f"{subject}.unknown_fields",
+    )
+
+
+@lru_cache(maxsize=None)
+def get_address_map_plan(map_type: str) -> Optional[SchemaPlan]:
+    if map_type not in addressMapSchemas:
+        return None
+    return compile_schema(map_type, addressMapSchemas[map_type], "register")
+
+
+@lru_cache(maxsize=None)
+def get_device_plan(device_type: str) -> Optional[SchemaPlan]:
+    if device_type not in deviceSchemas:
+        return None
+    return compile_schema(device_type, deviceSchemas[device_type], "device")
@@ -1,128 +1,225 @@
-import re
-from schemas.schemas import addressMapSchemas, expressionSchema
-from helpers.typing import validateType, expectedTypeToString
-from validators.registers import validate_required_registers, build_registers_by_name
+from typing import BinaryIO, Iterable, Optional
+from schemas.schemas import expressionSchema
+from schemas.compiler import get_address_map_plan
+from helpers.typing import validateType
+from helpers.io import iter_json_array
+from validators.registers import validate_required_registers
+from validators.expressions import expression_references, build_expression_graph, find_expression_cycles, cycle_path, expression_evaluation_order
 from validators.result import merge_validation_results
 from validators.result import ValidationResult
+from validators.index import ProjectIndex, file_ref
+from validators.suggest import NameIndex, format_suggestions
+
+
+def required_registers_for(map_type: str, precharge_contactor_feedback: bool = False) -> list[tuple[str, str, str]]:
+    if map_type == "Precharge":
+        required_registers = [
+            ("control.contactor.main", "type", "output"),
+            ("control.contactor.auxiliary", "type", "output"),
+        ]
+
+        if precharge_contactor_feedback is True:
+            required_registers = required_registers + [
+                ("measure.contactor.main", "type", "input"),
+                ("measure.contactor.auxiliary", "type", "input"),
+            ]
+
+        return required_registers
+
+    if map_type == "Breaker":
+        return [("measure.breaker", "type", "input")]
+
+    if map_type == "Contactor":
+        return [("measure.contactor", "type", "input")]
+
+    return []
 
 
 def validate_address_map(
-    registers: list[dict],
+    registers: Iterable[dict],
     map_type: str,
     precharge_contactor_feedback: bool = False,
+    include_summary: bool = False,
+    max_errors: Optional[int] = None,
 ) -> ValidationResult:
-    result = ValidationResult([])
-
-    if map_type not in addressMapSchemas:
-        result.add("error", f"Invalid map type '{map_type}'")
+    """
+    Validate an address map. registers may be any iterable (such as the
+    iter_json_array stream used by validate_address_map_stream); it is walked
+    exactly once and only register names, expressions and the registers named
+    in the map type's required register list are kept.
+
+    For Modbus TCP/IP maps, overlapping address ranges within a function code
+    are reported, for CANbus maps signals sharing bits of a frame or running
+    past byte 7. include_summary adds layout summaries as info messages:
+    unmapped address ranges and read requests per poll (register by register
+    and in block reads, see validators.modbus.plan_reads) per function code,
+    bit utilization per CAN frame and the evaluation order of expression
+    registers.
+
+    Expression registers referencing each other in a cycle are errors.
+
+    max_errors bounds the number of errors reported; once it is reached the
+    remaining registers and cross-register checks are skipped.
+    """
+    result = ValidationResult([], max_errors=max_errors)
+
+    plan = get_address_map_plan(map_type)
+    if plan is None:
+        result.emit("error", "address_map.invalid_map_type", map_type)
         return result
 
-    required = addressMapSchemas[map_type]["required"]
-    optional = addressMapSchemas[map_type]["optional"]
-    constraints = addressMapSchemas[map_type].get("constraints", {})
+    required_registers = required_registers_for(map_type, precharge_contactor_feedback)
+    required_names = {register_name for register_name, _, _ in required_registers}
+    registers_by_name: dict[str, dict] = {}
 
     seen_names = set()
     expressions = []
+    # Protocol layout checks are only imported for the map types that use them
+    spans = layouts = None
+    if map_type == "Modbus TCP/IP":
+        from validators.modbus import register_span, validate_register_overlaps
+        spans = []
+        multi_read = set()
+    elif map_type == "CANbus":
+        from validators.canbus import signal_layout, validate_can_layout
+        layouts = []
 
     for idx, reg in enumerate(registers):
+        if result.exhausted:
+            result.truncate()
+            return result
+
+        if not isinstance(reg, dict):
+            result.emit("error", "address_map.register_not_object", f"register[{idx}]")
+            continue
+
         name = reg.get("name", f"register[{idx}]")
 
         if name in seen_names:
-            result.add("error", f"Duplicate register '{name}'")
+            result.emit("error", "address_map.duplicate_register", name)
         seen_names.add(name)
 
+        if name in required_names:
+            registers_by_name[name] = reg
+
         if "expression" in reg:
             if validateType(reg["expression"], expressionSchema["expression"]):
                 expressions.append((name, reg["expression"]))
             else:
-                result.add("error", f"Invalid expression in register '{name}'")
+                result.emit("error", "address_map.invalid_expression", name)
             continue
 
-        for field, expected in required.items():
-            if field not in reg:
-                result.add("error", f"Register '{name}' missing '{field}'")
-            elif not validateType(reg[field], expected):
-                result.add("error", f"Register '{name}' field '{field}' expected {expectedTypeToString(expected)}")
-
-        for field, rule in constraints.items():
-            if field not in reg:
-                continue
-
-            value = reg[field]
-            if not isinstance(value, (int, float)):
-                continue
-
-            if "min" in rule and value < rule["min"]:
-                result.add("error", f"Register '{name}' field '{field}' must be between {rule.get('min')} and {rule.get('max')}")
-            elif "max" in rule and value > rule["max"]:
-                result.add("error", f"Register '{name}' field '{field}' must be between {rule.get('min')} and {rule.get('max')}")
-
-        for field, expected in optional.items():
-            if field in reg and not validateType(reg[field], expected):
-                result.add("warning", f"Register '{name}' optional field '{field}' expected {expectedTypeToString(expected)}")
-
-        unknown = set(reg) - set(required) - set(optional)
-        if unknown:
-            result.add("warning", f"Register '{name}' unknown fields: {', '.join(unknown)}")
+        for rule in plan.required:
+            if rule.field not in reg:
+                result.emit("error", rule.missing_code, name, rule.field)
+            elif not rule.accepts(reg[rule.field]):
+                result.emit("error", rule.type_code, name, rule.field, rule.expected)
+
+        for rule in plan.constraints:
+            value = reg.get(rule.field)
+            if isinstance(value, (int, float)) and not rule.accepts(value):
+                result.emit("error", rule.code, name, rule.field, rule.minimum, rule.maximum)
+
+        for rule in plan.optional:
+            if rule.field in reg and not rule.accepts(reg[rule.field]):
+                result.emit("warning", rule.type_code, name, rule.field, rule.expected)
+
+        if not plan.allowed_keys.issuperset(reg):
+            unknown = [key for key in reg if key not in plan.allowed_keys]
+            result.emit("warning", plan.unknown_code, name, ', '.join(unknown))
+
+        if spans is not None:
+            span = register_span(reg)
+            if span is not None:
+                spans.append(span)
+                if reg.get("multiRead") is True:
+                    multi_read.add(span[3])
+
+        if layouts is not None:
+            layout = signal_layout(reg)
+            if layout is not None:
+                layouts.append(layout)
 
     # Expression cross-check
+    name_index = None
     for name, expr in expressions:
-        refs = re.findall(r"{([^}]+)}", expr)
+        refs = expression_references(expr)
         missing = [r for r in refs if r not in seen_names]
-        if missing:
-            result.add("error", f"Expression '{name}' references missing registers: {missing}")
-
-    if map_type == "Modbus TCP/IP" and "communicationCheck" not in seen_names:
-        result.add("error", "Missing required register 'communicationCheck' for Modbus TCP/IP")
+        if not missing:
+            continue
 
-    if map_type == "Precharge":
-        required_registers = [
-            ("control.contactor.main", "type", "output"),
-            ("control.contactor.auxiliary", "type", "output"),
-        ]
+        if name_index is None:
+            name_index = NameIndex(seen_names)
+        suggestions = [s for r in missing for s in name_index.suggest(r, limit=1)]
+        if suggestions:
+            result.emit("error", "expression.missing_references_suggestions", name, missing, format_suggestions(suggestions))
+        else:
+            result.emit("error", "expression.missing_references", name, missing)
+
+    if expressions:
+        graph = build_expression_graph(expressions)
+        for cycle in find_expression_cycles(graph):
+            if len(cycle) == 1:
+                result.emit("error", "expression.self_reference", cycle[0])
+            else:
+                result.emit("error", "expression.cycle", " -> ".join(cycle_path(graph, cycle)))
 
-        if precharge_contactor_feedback is True:
-            required_registers = required_registers + [
-                ("measure.contactor.main", "type", "input"),
-                ("measure.contactor.auxiliary", "type", "input"),
-            ]
+        if include_summary:
+            order = expression_evaluation_order(graph)
+            result.emit("info", "expression.evaluation_order", ", ".join(order) if order else "(none)")
 
-        registers_by_name = build_registers_by_name(registers)
+    if map_type == "Modbus TCP/IP" and "communicationCheck" not in seen_names:
+        result.emit("error", "address_map.missing_communication_check")
 
-        regs_result = validate_required_registers(registers_by_name, required_registers)
-        result = merge_validation_results(result, regs_result)
+    if result.exhausted:
+        if spans or layouts or required_registers:
+            result.truncate()
+        return result
 
-    if map_type == "Breaker":
-        required_registers = [("measure.breaker", "type", "input")]
+    errors_left = result.errors_left
 
-        registers_by_name = build_registers_by_name(registers)
-        regs_result = validate_required_registers(registers_by_name, required_registers)
-        result = merge_validation_results(result, regs_result)
+    if spans:
+        result = merge_validation_results(result, validate_register_overlaps(spans, include_summary, multi_read))
 
-    if map_type == "Contactor":
-        required_registers = [("measure.contactor", "type", "input")]
+    if layouts:
+        result = merge_validation_results(result, validate_can_layout(layouts, include_summary, max_errors=errors_left))
 
-        registers_by_name = build_registers_by_name(registers)
-        regs_result = validate_required_registers(registers_by_name, required_registers)
+    if required_registers:
+        regs_result = validate_required_registers(registers_by_name, required_registers, max_errors=errors_left)
         result = merge_validation_results(result, regs_result)
 
     return result
 
 
-def get_precharge_contactor_feedback(devices_payload, address_map_file) -> bool:
-    precharge_contactor_feedback = False
+def validate_address_map_stream(
+    stream: BinaryIO,
+    map_type: str,
+    precharge_contactor_feedback: bool = False,
+    include_summary: bool = False,
+    max_errors: Optional[int] = None,
+) -> ValidationResult:
+    """
+    Validate an address map file without loading it: registers are decoded
+    one at a time from the top-level JSON array and dropped once checked, so
+    memory stays roughly flat regardless of the file size.
+    """
+    try:
+        return validate_address_map(iter_json_array(stream), map_type, precharge_contactor_feedback, include_summary, max_errors)
+    except ValueError as e:
+        result = ValidationResult([])
+        result.emit("error", "file.invalid_json", str(e))
+        return result
+
 
-    address_map_ref = address_map_file[:-5] if address_map_file.endswith(".json") else address_map_file
-    for device in devices_payload:
-        if not isinstance(device, dict):
-            continue
+def get_precharge_contactor_feedback(devices_payload, address_map_file, index: Optional[ProjectIndex] = None) -> bool:
+    if index is None:
+        index = ProjectIndex(devices_payload)
+
+    address_map_ref = file_ref(address_map_file)
+    for _, device in index.devices_with_address_map(address_map_ref):
         if device.get("type") != "precharge":
             continue
-        if device.get("addressMap") != address_map_ref:
-            continue
 
-        if device.get("contactorFeedback") is True:
-            precharge_contactor_feedback = True
-        break
+        return device.get("contactorFeedback") is True
 
-    return precharge_contactor_feedback
\ No newline at end of file
+    return False
@@ -0,0 +1,120 @@
+"""
+CANbus address map bit layout analysis.
+
+Every signal is converted to a 64-bit occupancy mask over the 8 data bytes
+of its frame (bit index = byte * 8 + bit). Masks are OR'd per canId, so a
+collision is found with a single AND per signal.
+"""
+
+from typing import Iterable, Optional
+
+from validators.result import ValidationResult
+
+FRAME_BITS = 64
+DEFAULT_BYTE_ORDER = "little"
+
+# (canId, name, 64-bit mask)
+Signal = tuple[int, str, int]
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def signal_mask(start_byte: int, start_bit: int, bit_length: int, byte_order: str = DEFAULT_BYTE_ORDER) -> Optional[int]:
+    """
+    Occupancy mask of a signal, or None when it runs past byte 7.
+
+    little (Intel): startByte/startBit is the least significant bit and the
+    signal grows towards higher bit numbers, continuing into the next byte.
+    big (Motorola): startByte/startBit is the most significant bit and the
+    signal grows towards bit 0, continuing at bit 7 of the next byte.
+    """
+    if byte_order == "big":
+        mask = 0
+        byte, bit, remaining = start_byte, start_bit, bit_length
+        while remaining > 0:
+            if byte > 7:
+                return None
+            taken = min(remaining, bit + 1)
+            low = bit - taken + 1
+            mask |= ((1 << taken) - 1) << (byte * 8 + low)
+            remaining -= taken
+            byte, bit = byte + 1, 7
+        return mask
+
+    position = start_byte * 8 + start_bit
+    if position + bit_length > FRAME_BITS:
+        return None
+    return ((1 << bit_length) - 1) << position
+
+
+def signal_layout(reg: dict) -> Optional[tuple[int, str, int, int, int, str]]:
+    """
+    (canId, name, startByte, startBit, bitLength, byteOrder) of a register,
+    or None when the fields needed for the layout are missing or out of range.
+    """
+    can_id = reg.get("canId")
+    start_byte = reg.get("startByte")
+    start_bit = reg.get("startBit")
+    bit_length = reg.get("bitLength")
+
+    if not all(_is_int(v) for v in (can_id, start_byte, start_bit, bit_length)):
+        return None
+    if not (0 <= start_byte <= 7 and 0 <= start_bit <= 7 and 1 <= bit_length <= FRAME_BITS):
+        return None
+
+    byte_order = reg.get("byteOrder", DEFAULT_BYTE_ORDER)
+    if byte_order not in ("big", "little"):
+        byte_order = DEFAULT_BYTE_ORDER
+
+    return (can_id, reg.get("name"), start_byte, start_bit, bit_length, byte_order)
+
+
+def _describe_bits(mask: int) -> str:
+    bits = [i for i in range(FRAME_BITS) if mask >> i & 1]
+    ranges = []
+    start = prev = bits[0]
+    for bit in bits[1:]:
+        if bit != prev + 1:
+            ranges.append((start, prev))
+            start = bit
+        prev = bit
+    ranges.append((start, prev))
+    return ", ".join(f"{a}" if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def validate_can_layout(layouts: Iterable[tuple], include_summary: bool = False, max_errors: Optional[int] = None) -> ValidationResult:
+    result = ValidationResult([], max_errors=max_errors)
+
+    occupied: dict[int, int] = {}
+    signals_by_frame: dict[int, list[Signal]] = {}
+
+    for can_id, name, start_byte, start_bit, bit_length, byte_order in layouts:
+        if result.exhausted:
+            result.truncate()
+            return result
+
+        mask = signal_mask(start_byte, start_bit, bit_length, byte_order)
+        if mask is None:
+            result.emit("error", "canbus.overrun", name, can_id, bit_length, start_byte, start_bit, byte_order)
+            continue
+
+        frame_mask = occupied.get(can_id, 0)
+        frame_signals = signals_by_frame.setdefault(can_id, [])
+
+        if frame_mask & mask:
+            for _, other_name, other_mask in frame_signals:
+                shared = other_mask & mask
+                if shared:
+                    result.emit("warning", "canbus.overlap", other_name, name, can_id, _describe_bits(shared))
+
+        occupied[can_id] = frame_mask | mask
+        frame_signals.append((can_id, name, mask))
+
+    if include_summary:
+        for can_id in sorted(occupied):
+            used = bin(occupied[can_id]).count("1")
+            result.emit("info", "canbus.utilization", can_id, used, FRAME_BITS, used * 100 // FRAME_BITS, len(signals_by_frame[can_id]))
+
+    return result
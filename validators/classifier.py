@@ -0,0 +1,185 @@
+"""
+File role and address map type detection from key signatures.
+
+A file is classified from its top-level shape and the keys of a small
+sample of its entries, scored against the required and allowed field sets
+of the schemas; no validation pass is made. Each candidate is scored as
+
+    coverage (share of the required fields present)
+    x purity (share of the present keys the schema allows)
+
+averaged over the sample. The confidence is the winning role's score,
+halved when the runner-up role scores the same. Address map types that tie
+are told apart by the optional keys present and, for the Digital I/O
+family, by its required registers; map types that still tie (Digital I/O
+and Analog I/O maps using neither's optional keys) leave map_type None and
+are listed as candidates, without lowering the role's confidence.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from schemas.schemas import (
+    addressMapSchemas,
+    configSchema,
+    controlMapSchema,
+    deviceSchemas,
+    expressionSchema,
+    optionalCANbusDeviceFields,
+    optionalModbusDeviceFields,
+    optionalMQTTDeviceFields,
+    requiredDeviceFields,
+    requiredModbusDeviceFields,
+    requiredMQTTDeviceFields,
+)
+
+SAMPLE_SIZE = 32
+
+# Address map types sharing a schema are told apart by their required registers
+DIO_MAP_TYPES = ("Precharge", "Breaker", "Contactor")
+EXPRESSION_KEYS = frozenset(expressionSchema)
+
+
+@dataclass(frozen=True)
+class Classification:
+    role: Optional[str]         # one of pipeline.FILE_ROLES, None when unknown
+    map_type: Optional[str]     # for address maps, None when undetermined
+    confidence: float           # 0 to 1
+    # Map types the entries fit equally well when map_type is None
+    candidates: tuple[str, ...] = ()
+
+
+UNKNOWN = Classification(None, None, 0.0)
+
+
+@dataclass(frozen=True)
+class _Signature:
+    required: frozenset
+    allowed: frozenset
+
+    def score(self, keys: frozenset) -> float:
+        if not keys:
+            return 0.0
+        coverage = len(self.required.intersection(keys)) / len(self.required) if self.required else 1.0
+        purity = len(self.allowed.intersection(keys)) / len(keys)
+        return coverage * purity
+
+
+@lru_cache(maxsize=None)
+def _signatures() -> dict:
+    def signature(required, optional=()) -> _Signature:
+        return _Signature(frozenset(required), frozenset(required) | frozenset(optional))
+
+    device_fields = set()
+    for schema in deviceSchemas.values():
+        device_fields.update(schema["required"], schema["optional"])
+    for fields in (requiredModbusDeviceFields, optionalModbusDeviceFields, requiredMQTTDeviceFields, optionalMQTTDeviceFields, optionalCANbusDeviceFields):
+        device_fields.update(fields)
+
+    return {
+        "Config": signature(configSchema["required"], configSchema["optional"]),
+        "Devices": signature(requiredDeviceFields, device_fields),
+        "Control Map": signature(controlMapSchema),
+        "maps": {
+            map_type: signature(schema["required"], schema["optional"])
+            for map_type, schema in addressMapSchemas.items()
+        },
+    }
+
+
+def _mean_score(signature: _Signature, shapes: Counter) -> float:
+    return sum(signature.score(keys) * count for keys, count in shapes.items()) / sum(shapes.values())
+
+
+def _ranked(scores: dict[str, float]) -> tuple[str, float, float]:
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    return best, best_score, runner_up
+
+
+def _confidence(best_score: float, runner_up: float) -> float:
+    if best_score <= 0:
+        return 0.0
+    return round(best_score / 2 if runner_up >= best_score else best_score, 3)
+
+
+def _optional_evidence(signature: _Signature, shapes: Counter) -> int:
+    optional = signature.allowed - signature.required
+    return sum(len(optional.intersection(keys)) * count for keys, count in shapes.items())
+
+
+def _classify_map_type(sample: list[dict], shapes: Counter) -> tuple[Optional[str], float, tuple[str, ...]]:
+    """
+    (map type or None, score, candidates when the map type is None).
+    """
+    signatures = _signatures()["maps"]
+    registers = Counter({keys: count for keys, count in shapes.items() if not EXPRESSION_KEYS <= keys})
+    if not registers:
+        # Only expression registers: an address map of any type
+        return None, 1.0, ()
+
+    scores = {map_type: _mean_score(signature, registers) for map_type, signature in signatures.items()}
+    best, best_score, _ = _ranked(scores)
+    tied = [map_type for map_type, score in scores.items() if score == best_score]
+    if len(tied) == 1:
+        return best, best_score, ()
+
+    evidence = {map_type: _optional_evidence(signatures[map_type], registers) for map_type in tied}
+    most = max(evidence.values())
+    tied = [map_type for map_type in tied if evidence[map_type] == most]
+
+    # Digital I/O, Precharge, Breaker and Contactor share a schema
+    if "Digital I/O" in tied:
+        from validators.address_map import required_registers_for
+
+        names = {reg.get("name") for reg in sample}
+        for map_type in DIO_MAP_TYPES:
+            required = {name for name, _, _ in required_registers_for(map_type)}
+            if map_type in tied and required <= names:
+                return map_type, best_score, ()
+        tied = [map_type for map_type in tied if map_type not in DIO_MAP_TYPES]
+
+    if len(tied) == 1:
+        return tied[0], best_score, ()
+    return None, best_score, tuple(tied)
+
+
+def classify(data, sample_size: int = SAMPLE_SIZE) -> Classification:
+    """
+    Classify a parsed JSON payload. Only the first sample_size entries of a
+    list are looked at.
+    """
+    signatures = _signatures()
+
+    if isinstance(data, dict):
+        keys = frozenset(data)
+        config_score = signatures["Config"].score(keys)
+        # A single control register object is also accepted as a control map
+        control_score = signatures["Control Map"].score(keys)
+        if control_score > config_score:
+            return Classification("Control Map", None, _confidence(control_score, config_score))
+        return Classification("Config", None, _confidence(config_score, control_score)) if config_score else UNKNOWN
+
+    if not isinstance(data, list):
+        return UNKNOWN
+
+    sample = [entry for entry in data[:sample_size] if isinstance(entry, dict)]
+    if not sample:
+        return UNKNOWN
+
+    # Entries of one file mostly share a few key sets, each is scored once
+    shapes = Counter(frozenset(entry) for entry in sample)
+    map_type, map_score, candidates = _classify_map_type(sample, shapes)
+    scores = {
+        "Devices": _mean_score(signatures["Devices"], shapes),
+        "Control Map": _mean_score(signatures["Control Map"], shapes),
+        "Address Map": map_score,
+    }
+    role, best_score, runner_up = _ranked(scores)
+
+    if role == "Address Map":
+        return Classification(role, map_type, _confidence(best_score, runner_up), candidates)
+    return Classification(role, None, _confidence(best_score, runner_up))
@@ -0,0 +1,68 @@
+"""
+Parser for control map command strings.
+
+A commands string is a '|' separated list of tokens:
+    <command>?          read
+    <command>=<value>   write
+
+Both the control map schema check and the cross-file command reference
+check run off the same parse, which is cached per distinct commands string.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+READ = "read"
+WRITE = "write"
+INVALID = "invalid"
+
+
+class Command(NamedTuple):
+    kind: str               # READ, WRITE or INVALID
+    base: str               # command (register) name, "" when missing
+    value: Optional[str]    # written value for WRITE commands
+    position: int           # token index in the commands string
+    token: str              # stripped token text
+    error: Optional[str]    # message code for INVALID commands
+
+
+def _parse_token(token: str, position: int) -> Command:
+    if token == "":
+        return Command(INVALID, "", None, position, token, "command.empty")
+
+    if token.endswith("?"):
+        base = token[:-1].strip()
+        if "=" in token:
+            return Command(INVALID, base, None, position, token, "command.read_with_value")
+        if base == "":
+            return Command(INVALID, base, None, position, token, "command.read_without_command")
+        return Command(READ, base, None, position, token, None)
+
+    if "=" in token:
+        left, right = token.split("=", 1)
+        left = left.strip()
+        right = right.strip()
+
+        if left == "" or right == "":
+            return Command(INVALID, left, right, position, token, "command.write_incomplete")
+        if left.endswith("?"):
+            return Command(INVALID, left, right, position, token, "command.write_with_read")
+        return Command(WRITE, left, right, position, token, None)
+
+    return Command(INVALID, "", None, position, token, "command.unknown")
+
+
+@lru_cache(maxsize=65536)
+def parse_commands(commands: str) -> tuple[Command, ...]:
+    if commands.strip() == "":
+        return ()
+    return tuple(_parse_token(t.strip(), position) for position, t in enumerate(commands.split("|")))
+
+
+def command_error_args(control_register_name, command: Command) -> tuple:
+    """
+    Arguments for the message code of an INVALID command.
+    """
+    if command.error == "command.empty":
+        return (control_register_name, command.position)
+    return (control_register_name, command.token)
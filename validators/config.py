@@ -1,10 +1,12 @@
+from typing import Optional
+
 from schemas.schemas import configSchema
 from helpers.typing import validateType, expectedTypeToString
 from validators.result import ValidationResult
 
 
-def validate_config(config) -> ValidationResult:
-    result = ValidationResult([])
+def validate_config(config, max_errors: Optional[int] = None) -> ValidationResult:
+    result = ValidationResult([], max_errors=max_errors)
 
     def _join_path(base: str, key: str) -> str:
         if not base:
@@ -12,22 +14,25 @@ def validate_config(config) -> ValidationResult:
         return f"{base}.{key}"
 
     def _validate_node(value, schema, path: str):
+        if result.truncated:
+            return
+
         if not isinstance(schema, dict):
             if not validateType(value, schema):
-                result.add("error", f"Field '{path}' expected {expectedTypeToString(schema)}")
+                result.emit("error", "config.field_type", path, expectedTypeToString(schema))
             return
 
         required = schema.get("required", {})
         optional = schema.get("optional", {})
 
         if not isinstance(value, dict):
-            result.add("error", f"Field '{path}' must be an object")
+            result.emit("error", "config.field_not_object", path)
             return
 
         for key, expected in required.items():
             if key not in value:
                 container = path if path else "root"
-                result.add("error", f"Missing '{key}' in '{container}'")
+                result.emit("error", "config.missing_key", key, container)
                 continue
 
             child_path = _join_path(path, key)
@@ -42,10 +47,10 @@ def validate_config(config) -> ValidationResult:
         unknown = set(value) - set(required) - set(optional)
         if unknown:
             container = path if path else "root"
-            result.add("warning", f"Unknown fields at '{container}': {', '.join(sorted(unknown))}")
+            result.emit("warning", "config.unknown_fields", container, ", ".join(sorted(unknown)))
 
     if not isinstance(config, dict):
-        result.add("error", "Config must be an object")
+        result.emit("error", "config.not_object")
         return result
 
     _validate_node(config, configSchema, "")
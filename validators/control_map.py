@@ -1,72 +1,52 @@
+from typing import Optional
+
 from schemas.schemas import controlMapSchema
 from helpers.typing import validateType, expectedTypeToString
 from validators.result import ValidationResult
+from validators.commands import INVALID, parse_commands, command_error_args
 
 
-def validate_control_maps(control_maps) -> ValidationResult:
-    result = ValidationResult([])
+def validate_control_maps(control_maps, max_errors: Optional[int] = None) -> ValidationResult:
+    result = ValidationResult([], max_errors=max_errors)
 
     if isinstance(control_maps, dict):
         control_maps = [control_maps]
 
     if not isinstance(control_maps, list):
-        result.add("error", f"Control map file must be a list (or object), got {type(control_maps).__name__}")
+        result.emit("error", "control_map.not_list", type(control_maps).__name__)
         return result
 
     seen_names = set()
 
     for idx, cm in enumerate(control_maps):
+        if result.exhausted:
+            result.truncate()
+            break
+
         name = cm.get("name", f"register[{idx}]")
 
         if name in seen_names:
-            result.add("error", f"Duplicate control register name '{name}'")
+            result.emit("error", "control_map.duplicate_name", name)
             continue
         seen_names.add(name)
 
         if not isinstance(cm, dict):
-            result.add("error", f"{name} must be an object")
+            result.emit("error", "control_map.not_object", name)
             continue
 
         for field, expected in controlMapSchema.items():
             if field not in cm:
-                result.add("error", f"Control register '{name}' missing '{field}'")
+                result.emit("error", "control_map.missing_field", name, field)
             elif not validateType(cm[field], expected):
-                result.add("error", f"Control register '{name}' field '{field}' expected {expectedTypeToString(expected)}")
+                result.emit("error", "control_map.field_type", name, field, expectedTypeToString(expected))
 
         if "commands" in cm and isinstance(cm.get("commands"), str):
-            if cm["commands"].strip() != "":
-                tokens = [t.strip() for t in cm["commands"].split("|")]
-                for t_idx, token in enumerate(tokens):
-                    if token == "":
-                        result.add("error", f"Control register '{name}' field 'commands' contains an empty command at position {t_idx}")
-                        continue
-
-                    if token.endswith("?"):
-                        if "=" in token:
-                            result.add("error", f"Control register '{name}' read command '{token}' must not contain '='")
-                            continue
-
-                        base = token[:-1].strip()
-                        if base == "":
-                            result.add("error", f"Control register '{name}' read command '{token}' must have a command before '?'")
-                            continue
-                    elif "=" in token:
-                        left, right = token.split("=", 1)
-                        left = left.strip()
-                        right = right.strip()
-
-                        if left == "" or right == "":
-                            result.add("error", f"Control register '{name}' write command '{token}' must have a command before '=' and a value after")
-                            continue
-
-                        if left.endswith("?"):
-                            result.add("error", f"Control register '{name}' write command '{token}' must not have '?' in the command part")
-                            continue
-                    else:
-                        result.add("error", f"Control register '{name}' command '{token}' must end with '?' (read) or contain '=' (write)")
+            for command in parse_commands(cm["commands"]):
+                if command.kind == INVALID:
+                    result.emit("error", command.error, *command_error_args(name, command))
 
         unknown = set(cm) - set(controlMapSchema)
         if unknown:
-            result.add("warning", f"Control register '{name}' unknown fields: {', '.join(unknown)}")
+            result.emit("warning", "control_map.unknown_fields", name, ", ".join(unknown))
 
     return result
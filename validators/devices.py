@@ -1,39 +1,45 @@
+from typing import Optional
+
 from schemas.schemas import deviceSchemas
-from helpers.typing import validateType, expectedTypeToString
+from schemas.compiler import get_device_plan
 from validators.result import ValidationResult
 
 
-def validate_devices(devices: list[dict]) -> ValidationResult:
-    result = ValidationResult([])
+def validate_devices(devices: list[dict], max_errors: Optional[int] = None) -> ValidationResult:
+    result = ValidationResult([], max_errors=max_errors)
 
     ids = set()
 
     for idx, device in enumerate(devices):
+        if result.exhausted:
+            result.truncate()
+            break
+
         device_id = device.get("id", f"device[{idx}]")
 
         if device_id in ids:
-            result.add("error", f"Duplicate device id '{device_id}'")
+            result.emit("error", "device.duplicate_id", device_id)
         ids.add(device_id)
 
         dtype = device.get("type")
         if dtype not in deviceSchemas:
             if dtype is None:
-                result.add("error", f"Device '{device_id}' missing 'type'")
+                result.emit("error", "device.missing_type", device_id)
             else:
-                result.add("error", f"Device '{device_id}' has unknown device type '{dtype}'")
+                result.emit("error", "device.unknown_type", device_id, dtype)
             
             continue
 
-        schema = deviceSchemas[dtype]
+        plan = get_device_plan(dtype)
 
-        for field, expected in schema["required"].items():
-            if field not in device:
-                result.add("error", f"Device '{device_id}' missing '{field}'")
-            elif not validateType(device[field], expected):
-                result.add("error", f"Device '{device_id}' field '{field}' expected {expectedTypeToString(expected)}")
+        for rule in plan.required:
+            if rule.field not in device:
+                result.emit("error", rule.missing_code, device_id, rule.field)
+            elif not rule.accepts(device[rule.field]):
+                result.emit("error", rule.type_code, device_id, rule.field, rule.expected)
 
-        for field, expected in schema["optional"].items():
-            if field in device and not validateType(device[field], expected):
-                result.add("warning", f"Device '{device_id}' optional field '{field}' expected {expectedTypeToString(expected)}")
+        for rule in plan.optional:
+            if rule.field in device and not rule.accepts(device[rule.field]):
+                result.emit("warning", rule.type_code, device_id, rule.field, rule.expected)
 
     return result
\ No newline at end of file
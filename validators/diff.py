@@ -0,0 +1,509 @@
+"""
+Project diff: compare two versions of a project (directories or ZIP
+archives) and validate only what changed.
+
+Files are matched by path and compared by content hash, so unchanged files
+are never parsed unless a cross-file check needs them. Within a changed
+file, devices are matched by id, address and control map registers by
+name and config sections by top-level key.
+
+The validators then run on the changed entries plus the entries their
+checks read (registers overlapping a changed Modbus span or sharing a CAN
+frame, expression references, required registers), once on each version.
+Messages only the new version has are reported as introduced, messages
+only the old version has as resolved. Control map command checks are
+rerun for control maps whose file, devices or address maps changed.
+"""
+
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from helpers.io import open_project_source
+from validators.address_map import get_precharge_contactor_feedback, required_registers_for, validate_address_map
+from validators.canbus import signal_layout
+from validators.config import validate_config
+from validators.control_map import validate_control_maps
+from validators.devices import validate_devices
+from validators.expressions import expression_references
+from validators.index import ProjectIndex, file_ref
+from validators.modbus import register_span
+from validators.pipeline import DEFAULT_MAP_TYPE, build_selections, group_sites
+from validators.project import find_missing_device_references, validate_control_map_commands
+from validators.result import ValidationResult, merge_validation_results
+
+# Key field and fallback label of the entries of each file role
+ENTRY_KEYS = {
+    "Devices": ("id", "device"),
+    "Address Map": ("name", "register"),
+    "Control Map": ("name", "register"),
+}
+
+
+@dataclass
+class EntryChange:
+    key: str        # device id, register name or config key
+    change: str     # "added", "removed" or "modified"
+
+
+@dataclass
+class FileDiff:
+    name: str
+    role: str
+    map_type: Optional[str]
+    change: str     # "added", "removed", "modified", or "affected" for cross-file rechecks only
+    entries: list[EntryChange] = field(default_factory=list)
+    introduced: ValidationResult = field(default_factory=ValidationResult)
+    resolved: ValidationResult = field(default_factory=ValidationResult)
+
+
+@dataclass
+class ProjectDiff:
+    files: list[FileDiff]
+    unchanged: int
+
+    @property
+    def has_errors(self) -> bool:
+        return any(f.introduced.has_errors for f in self.files)
+
+    def to_dict(self) -> dict:
+        def messages(result: ValidationResult) -> list[dict]:
+            return [{"level": m.level, "code": m.code, "message": m.message} for m in result.iter_messages()]
+
+        return {
+            "status": "errors" if self.has_errors else "valid",
+            "unchanged": self.unchanged,
+            "files": [
+                {
+                    "name": f.name,
+                    "role": f.role,
+                    "map_type": f.map_type,
+                    "change": f.change,
+                    "entries": [{"key": e.key, "change": e.change} for e in f.entries],
+                    "introduced": messages(f.introduced),
+                    "resolved": messages(f.resolved),
+                }
+                for f in self.files
+            ],
+        }
+
+
+def _entry_key(entry, idx: int, key_field: str, label: str) -> str:
+    key = entry.get(key_field) if isinstance(entry, dict) else None
+    return key if isinstance(key, str) and key != "" else f"{label}[{idx}]"
+
+
+def _entries_by_key(payload, role: str) -> dict[str, list]:
+    """
+    Entries of a payload by key. Duplicate keys keep every entry, so a
+    duplicate shows up as a modification of that key.
+    """
+    if role == "Config":
+        return {key: [value] for key, value in payload.items()} if isinstance(payload, dict) else {}
+
+    key_field, label = ENTRY_KEYS[role]
+    entries: dict[str, list] = {}
+    for idx, entry in enumerate(payload):
+        entries.setdefault(_entry_key(entry, idx, key_field, label), []).append(entry)
+    return entries
+
+
+def diff_entries(old, new, role: str) -> list[EntryChange]:
+    old_entries = _entries_by_key(old, role)
+    new_entries = _entries_by_key(new, role)
+
+    changes = [EntryChange(key, "removed") for key in old_entries if key not in new_entries]
+    for key, entries in new_entries.items():
+        previous = old_entries.get(key)
+        if previous is None:
+            changes.append(EntryChange(key, "added"))
+        elif previous != entries:
+            changes.append(EntryChange(key, "modified"))
+    return changes
+
+
+def _difference(result: ValidationResult, other: ValidationResult) -> ValidationResult:
+    """
+    Messages of result that other does not have (counting repeats).
+    """
+    remaining = Counter((level, code, repr(args)) for level, code, args in other.iter_entries())
+    difference = ValidationResult([])
+    for level, code, args in result.iter_entries():
+        key = (level, code, repr(args))
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            difference.emit(level, code, *args)
+    return difference
+
+
+def _address_map_context(registers: list, names: set[str], map_type: str) -> set[str]:
+    """
+    Names of the registers the cross-register checks of the named registers
+    read: overlapping Modbus spans, signals of the same CAN frame, expression
+    references in both directions (transitively, so cycles through the named
+    registers are found) and the map type's required registers.
+    """
+    context = {name for name, _, _ in required_registers_for(map_type, True)}
+    context.add("communicationCheck")
+    spans: dict[int, list[tuple[int, int]]] = {}
+    can_ids = set()
+
+    references: dict[str, list[str]] = {}
+    dependents: dict[str, list[str]] = {}
+    for idx, reg in enumerate(registers):
+        if isinstance(reg, dict) and isinstance(reg.get("expression"), str):
+            key = _entry_key(reg, idx, "name", "register")
+            refs = expression_references(reg["expression"])
+            references.setdefault(key, []).extend(refs)
+            for ref in refs:
+                dependents.setdefault(ref, []).append(key)
+    for edges in (references, dependents):
+        reached = set()
+        stack = [name for name in names if name in edges]
+        while stack:
+            for neighbour in edges.get(stack.pop(), ()):
+                if neighbour not in reached:
+                    reached.add(neighbour)
+                    stack.append(neighbour)
+        context |= reached
+
+    for idx, reg in enumerate(registers):
+        if not isinstance(reg, dict) or _entry_key(reg, idx, "name", "register") not in names:
+            continue
+        span = register_span(reg)
+        if span is not None:
+            spans.setdefault(span[0], []).append((span[1], span[2]))
+        layout = signal_layout(reg)
+        if layout is not None:
+            can_ids.add(layout[0])
+
+    for idx, reg in enumerate(registers):
+        if not isinstance(reg, dict):
+            continue
+        key = _entry_key(reg, idx, "name", "register")
+        if key in names or key in context:
+            continue
+        span = register_span(reg)
+        if span is not None and any(start < span[2] and span[1] < end for start, end in spans.get(span[0], ())):
+            context.add(key)
+            continue
+        layout = signal_layout(reg)
+        if layout is not None and layout[0] in can_ids:
+            context.add(key)
+
+    return context
+
+
+def _subset(payload, role: str, keys: set[str]):
+    if role == "Config":
+        return {key: value for key, value in payload.items() if key in keys}
+    key_field, label = ENTRY_KEYS[role]
+    return [entry for idx, entry in enumerate(payload) if _entry_key(entry, idx, key_field, label) in keys]
+
+
+class _Version:
+    """
+    One project version of one site: file hashes up front, payloads parsed
+    on demand.
+    """
+
+    def __init__(self, source, names: list[str], root: str = ""):
+        self.source = source
+        self.root = root
+        self.names = names
+        self.hashes = {name: source.member_hash(root + name) for name in names}
+        self.available_files = {os.path.basename(name) for name in names}
+        self.by_base = {os.path.basename(name): name for name in names}
+        self._selections: dict[str, dict] = {}
+
+    def selections(self, names, roles, map_types, default_map_type) -> dict[str, dict]:
+        missing = [name for name in names if name in self.hashes and name not in self._selections]
+        items = [{"name": name, "bytes": self.read(name)} for name in missing]
+        for sel in build_selections(items, roles, map_types, default_map_type):
+            self._selections[sel["name"]] = sel
+        return {name: self._selections[name] for name in names if name in self._selections}
+
+    def read(self, name: str) -> bytes:
+        return self.source.read(self.root + name)
+
+    def size(self, name: str) -> int:
+        return self.source.size(self.root + name)
+
+    def devices(self, roles, map_types, default_map_type):
+        name = self.by_base.get("devices.json")
+        if name is None:
+            return None
+        sel = self.selections([name], roles, map_types, default_map_type)[name]
+        return sel["data"] if sel["parse_error"] is None else None
+
+
+def _validate_subset(role: str, map_type: Optional[str], payload, keys: Optional[set[str]], version: _Version, devices, name: str) -> ValidationResult:
+    """
+    Per-file checks on the entries named by keys (all entries when None),
+    plus the device reference check against this version's files.
+    """
+    if keys is not None:
+        payload = _subset(payload, role, keys)
+
+    if role == "Address Map":
+        feedback = map_type == "Precharge" and isinstance(devices, list) and get_precharge_contactor_feedback(devices, os.path.basename(name))
+        return validate_address_map(payload, map_type, feedback)
+    if role == "Devices":
+        if not isinstance(payload, list):
+            return validate_devices(payload)
+        refs = find_missing_device_references(payload, version.available_files)
+        return merge_validation_results(validate_devices(payload), refs)
+    if role == "Control Map":
+        return validate_control_maps(payload)
+    return validate_config(payload)
+
+
+def _same_file(old: _Version, new: _Version, name: str) -> bool:
+    if name not in old.hashes:
+        return False
+    if old.hashes[name] == new.hashes[name]:
+        return True
+    # Member hashes of different source kinds (or file mtimes) are not comparable
+    if old.size(name) != new.size(name):
+        return False
+    return old.read(name) == new.read(name)
+
+
+def _diff_site(old: _Version, new: _Version, roles: dict, map_types: dict, default_map_type: str) -> tuple[list[FileDiff], int]:
+    options = (roles, map_types, default_map_type)
+    changed = [name for name in new.names if not _same_file(old, new, name)]
+    removed = [name for name in old.names if name not in new.hashes]
+    unchanged = len(new.names) - len(changed)
+
+    new_sels = new.selections(changed, *options)
+    # The old version takes the role and map type detected for the new one
+    old_roles = {**{name: sel["role"] for name, sel in new_sels.items()}, **roles}
+    old_map_types = {**{name: sel["map_type"] for name, sel in new_sels.items() if sel["map_type"]}, **map_types}
+    old_sels = old.selections([name for name in changed + removed if name in old.hashes], old_roles, old_map_types, default_map_type)
+
+    old_devices = old.devices(*options)
+    new_devices = new.devices(*options)
+    files_changed = set(new.available_files) ^ set(old.available_files)
+
+    diffs: list[FileDiff] = []
+    changed_maps: set[str] = set()          # file refs of changed address maps
+    changed_control_maps: set[str] = set()  # file refs of changed control maps
+    changed_device_ids: set[str] = set()
+
+    for name in changed + removed:
+        new_sel = new_sels.get(name)
+        old_sel = old_sels.get(name)
+        sel = new_sel or old_sel
+        role, map_type = sel["role"], sel.get("map_type")
+        new_data = new_sel["data"] if new_sel and new_sel["parse_error"] is None else None
+        old_data = old_sel["data"] if old_sel and old_sel["parse_error"] is None else None
+
+        if new_sel is None:
+            diff = FileDiff(name, role, map_type, "removed")
+        elif old_sel is None:
+            diff = FileDiff(name, role, map_type, "added")
+            diff.introduced = _validate_selection_fully(new_sel, new, new_devices)
+        else:
+            diff = FileDiff(name, role, map_type, "modified")
+            shaped = role == "Config" and isinstance(old_data, dict) and isinstance(new_data, dict) or (
+                role != "Config" and isinstance(old_data, list) and isinstance(new_data, list)
+            )
+            if not shaped or new_sel["parse_error"] or old_sel["parse_error"]:
+                # Not comparable entry by entry: compare whole-file results
+                new_result = _validate_selection_fully(new_sel, new, new_devices)
+                old_result = _validate_selection_fully(old_sel, old, old_devices)
+            else:
+                diff.entries = diff_entries(old_data, new_data, role)
+                keys = {e.key for e in diff.entries}
+                if role == "Devices" and files_changed:
+                    # References to added or removed files change validity
+                    keys |= _devices_referencing(new_data, files_changed) | _devices_referencing(old_data, files_changed)
+                if role == "Address Map":
+                    keys |= _address_map_context(new_data, keys, map_type) | _address_map_context(old_data, keys, map_type)
+                new_result = _validate_subset(role, map_type, new_data, keys, new, new_devices, name)
+                old_result = _validate_subset(role, map_type, old_data, keys, old, old_devices, name)
+            diff.introduced = _difference(new_result, old_result)
+            diff.resolved = _difference(old_result, new_result)
+
+        if role == "Address Map":
+            changed_maps.add(file_ref(os.path.basename(name)))
+        elif role == "Control Map":
+            changed_control_maps.add(file_ref(os.path.basename(name)))
+        elif role == "Devices":
+            changed_device_ids.update(e.key for e in diff.entries)
+        diffs.append(diff)
+
+    diffs.extend(_affected_files(old, new, old_devices, new_devices, files_changed, changed_device_ids, diffs, options))
+    diffs.extend(_affected_control_maps(old, new, old_devices, new_devices, changed_maps, changed_control_maps, changed_device_ids, diffs, options))
+    return diffs, unchanged
+
+
+def _devices_referencing(devices, file_names: set[str]) -> set[str]:
+    refs = {file_ref(name) for name in file_names}
+    return {
+        _entry_key(device, idx, "id", "device")
+        for idx, device in enumerate(devices)
+        if isinstance(device, dict) and (device.get("addressMap") in refs or device.get("controlMap") in refs)
+    }
+
+
+def _validate_selection_fully(sel: dict, version: _Version, devices) -> ValidationResult:
+    if sel["parse_error"] is not None:
+        result = ValidationResult([])
+        result.emit("error", "file.invalid_json", sel["parse_error"])
+        return result
+    return _validate_subset(sel["role"], sel.get("map_type"), sel["data"], None, version, devices, sel["name"])
+
+
+def _affected_files(old, new, old_devices, new_devices, files_changed, changed_device_ids, diffs, options) -> list[FileDiff]:
+    """
+    Recheck unchanged files whose cross-file inputs changed: device
+    references to added or removed files, and the required registers of
+    Precharge maps whose device changed its contactorFeedback flag.
+    """
+    diffed = {d.name for d in diffs}
+    affected: list[FileDiff] = []
+
+    def recheck(name: str, role: str, map_type: Optional[str], keys: set[str]):
+        old_sel = old.selections([name], *options).get(name)
+        new_sel = new.selections([name], *options).get(name)
+        if old_sel is None or new_sel is None or old_sel["parse_error"] or new_sel["parse_error"]:
+            return
+        new_result = _validate_subset(role, map_type, new_sel["data"], keys, new, new_devices, name)
+        old_result = _validate_subset(role, map_type, old_sel["data"], keys, old, old_devices, name)
+        diff = FileDiff(name, role, map_type, "affected", [], _difference(new_result, old_result), _difference(old_result, new_result))
+        if diff.introduced.total or diff.resolved.total:
+            affected.append(diff)
+
+    devices_name = new.by_base.get("devices.json")
+    if files_changed and isinstance(new_devices, list) and devices_name not in diffed:
+        recheck(devices_name, "Devices", None, _devices_referencing(new_devices, files_changed))
+
+    if changed_device_ids and isinstance(new_devices, list):
+        for idx, device in enumerate(new_devices):
+            if not isinstance(device, dict) or device.get("type") != "precharge":
+                continue
+            if _entry_key(device, idx, "id", "device") not in changed_device_ids:
+                continue
+            name = new.by_base.get(f"{device.get('addressMap')}.json")
+            if name is None or name in diffed:
+                continue
+            sel = new.selections([name], *options)[name]
+            if sel["role"] == "Address Map" and sel["map_type"] == "Precharge" and sel["parse_error"] is None:
+                recheck(name, "Address Map", "Precharge", _address_map_context(sel["data"], set(), "Precharge"))
+
+    return affected
+
+
+def _command_check(version: _Version, control_map_name: str, devices, options) -> ValidationResult:
+    if not isinstance(devices, list):
+        return ValidationResult([])
+    control_map = version.selections([control_map_name], *options).get(control_map_name)
+    if control_map is None or control_map["parse_error"] is not None:
+        return ValidationResult([])
+
+    index = ProjectIndex(devices, available_files=version.available_files)
+    paired = [f"{ref}.json" for ref in index.address_maps_for_control_map(file_ref(os.path.basename(control_map_name)))]
+    paired_names = [version.by_base[base] for base in paired if base in version.by_base]
+    address_maps = {
+        os.path.basename(name): sel["data"]
+        for name, sel in version.selections(paired_names, *options).items()
+        if sel["parse_error"] is None
+    }
+    index = ProjectIndex(devices, address_maps, version.available_files)
+    return validate_control_map_commands(
+        control_map_file=control_map_name,
+        control_map=control_map["data"],
+        devices=devices,
+        address_maps_by_file=address_maps,
+        index=index,
+    )
+
+
+def _affected_control_maps(old, new, old_devices, new_devices, changed_maps, changed_control_maps, changed_device_ids, diffs, options) -> list[FileDiff]:
+    """
+    Rerun the control map command checks for every control map whose file,
+    devices or paired address maps changed.
+    """
+    affected: set[str] = set(changed_control_maps)
+    for devices in (old_devices, new_devices):
+        if not isinstance(devices, list):
+            continue
+        for idx, device in enumerate(devices):
+            if not isinstance(device, dict) or not isinstance(device.get("controlMap"), str):
+                continue
+            if _entry_key(device, idx, "id", "device") in changed_device_ids or device.get("addressMap") in changed_maps:
+                affected.add(device["controlMap"])
+
+    by_name = {d.name: d for d in diffs}
+    extra: list[FileDiff] = []
+    for ref in sorted(affected):
+        name = new.by_base.get(f"{ref}.json")
+        if name is None:
+            continue
+        new_result = _command_check(new, name, new_devices, options)
+        old_result = _command_check(old, old.by_base[f"{ref}.json"], old_devices, options) if f"{ref}.json" in old.by_base else ValidationResult([])
+        introduced = _difference(new_result, old_result)
+        resolved = _difference(old_result, new_result)
+
+        diff = by_name.get(name)
+        if diff is None:
+            if not introduced.total and not resolved.total:
+                continue
+            diff = FileDiff(name, "Control Map", None, "affected")
+            extra.append(diff)
+        diff.introduced = merge_validation_results(diff.introduced, introduced)
+        diff.resolved = merge_validation_results(diff.resolved, resolved)
+    return extra
+
+
+def _common_root(names: list[str]) -> tuple[str, list[str]]:
+    """
+    Strip a folder every file is in (a ZIP made of the project folder), so
+    a directory and an archive of it line up.
+    """
+    roots = {name.split("/", 1)[0] for name in names}
+    if len(roots) != 1 or not all("/" in name for name in names):
+        return "", list(names)
+    root = roots.pop() + "/"
+    return root, [name[len(root):] for name in names]
+
+
+def diff_projects(
+    old_path: str,
+    new_path: str,
+    roles: Optional[dict[str, str]] = None,
+    map_types: Optional[dict[str, str]] = None,
+    default_map_type: str = DEFAULT_MAP_TYPE,
+) -> ProjectDiff:
+    """
+    Diff two project directories or ZIP archives and validate the changes.
+    Files are matched by their path below the project folder; archives with
+    several sites are compared site by site.
+    """
+    roles = roles or {}
+    map_types = map_types or {}
+    files: list[FileDiff] = []
+    unchanged = 0
+
+    with open_project_source(old_path) as old_source, open_project_source(new_path) as new_source:
+        old_root, old_names = _common_root(old_source.names)
+        new_root, new_names = _common_root(new_source.names)
+
+        old_sites = group_sites(old_names)
+        for site, names in group_sites(new_names).items():
+            old = _Version(old_source, old_sites.pop(site, []), old_root)
+            new = _Version(new_source, names, new_root)
+            site_files, site_unchanged = _diff_site(old, new, roles, map_types, default_map_type)
+            files.extend(site_files)
+            unchanged += site_unchanged
+
+        # Sites that no longer exist
+        for names in old_sites.values():
+            old = _Version(old_source, names, old_root)
+            for name, sel in old.selections(names, roles, map_types, default_map_type).items():
+                files.append(FileDiff(name, sel["role"], sel.get("map_type"), "removed"))
+
+    return ProjectDiff(files, unchanged)
@@ -0,0 +1,155 @@
+"""
+Persistent validation result cache.
+
+An SQLite file holding per-file ValidationResults, so a CLI run or page
+session over unchanged files does not start cold. Entries are keyed on the
+file name and its validators.incremental fingerprint (content hash, role,
+map type, dependencies and options). The whole cache is dropped when the
+code fingerprint changes, i.e. when schemas/schemas.py or any validator
+module is edited, and the least recently used entries are evicted past
+max_bytes.
+
+Results are stored pickled; the cache file is a local, per-user file and
+must not be shared with untrusted parties.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from validators.result import ValidationResult
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Evicting down to this share of max_bytes avoids evicting on every put
+_EVICT_TO = 0.9
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Sources whose changes invalidate every cached result
+_FINGERPRINTED_DIRS = ("schemas", "validators", "helpers")
+
+
+def default_cache_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("PPL_VALIDATION_CACHE") or os.path.join(cache_home, "ppl-config-tools", "results.sqlite")
+
+
+def code_fingerprint() -> str:
+    """
+    Hash of the schema and validator sources the cached results came from.
+    """
+    h = hashlib.sha256()
+    for folder in _FINGERPRINTED_DIRS:
+        path = os.path.join(_ROOT, folder)
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".py"):
+                with open(os.path.join(path, name), "rb") as f:
+                    h.update(f"{folder}/{name}\0".encode("utf-8"))
+                    h.update(f.read())
+    return h.hexdigest()
+
+
+class DiskResultCache:
+    """
+    Drop-in replacement for validators.incremental.ResultCache backed by an
+    SQLite file. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        # Autocommit with WAL: every statement is durable without an fsync per put
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, result BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+        fingerprint = code_fingerprint()
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'code'").fetchone()
+        if row is None or row[0] != fingerprint:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('code', ?)", (fingerprint,))
+
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if self._size > self.max_bytes:
+            self._evict()
+
+    @staticmethod
+    def _key(file_name: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{file_name}\0{fingerprint}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, file_name: str, fingerprint: str) -> Optional[ValidationResult]:
+        key = self._key(file_name, fingerprint)
+        with self._lock:
+            row = self._db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            # Written by an incompatible version: treat as a miss
+            return None
+
+    def put(self, file_name: str, fingerprint: str, result: ValidationResult):
+        key = self._key(file_name, fingerprint)
+        # Measurements describe the run that produced the result, not a cache hit
+        measurements = result.measurements
+        result.measurements = []
+        try:
+            blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            result.measurements = measurements
+
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, result, size, used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._size += len(blob) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        target = self.max_bytes * _EVICT_TO
+        evicted = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY used").fetchall():
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,148 @@
+"""
+Expression register dependency analysis.
+
+Expression registers reference other registers as {name}. References to
+other expression registers form a dependency graph; a cycle in that graph
+would make the controller loop, and an acyclic graph gives the order in
+which the controller can evaluate the expressions.
+"""
+
+import re
+from typing import Iterable
+
+EXPRESSION_REFERENCE = re.compile(r"{([^}]+)}")
+
+
+def expression_references(expr: str) -> list[str]:
+    return EXPRESSION_REFERENCE.findall(expr)
+
+
+def build_expression_graph(expressions: Iterable[tuple[str, str]]) -> dict[str, list[str]]:
+    """
+    Map each expression register to the expression registers it references,
+    in reference order without duplicates. References to plain registers are
+    leaves and are left out.
+    """
+    expressions = list(expressions)
+    names = {name for name, _ in expressions}
+
+    graph: dict[str, list[str]] = {}
+    for name, expr in expressions:
+        deps = graph.setdefault(name, [])
+        for ref in expression_references(expr):
+            if ref in names and ref not in deps:
+                deps.append(ref)
+
+    return graph
+
+
+def strongly_connected_components(graph: dict[str, list[str]]) -> list[list[str]]:
+    """
+    Tarjan's algorithm, iterative to stay clear of the recursion limit on
+    long dependency chains. Components are returned dependencies first
+    (reverse topological order of the edges name -> dependency).
+    """
+    index_of: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    counter = 0
+
+    for root in graph:
+        if root in index_of:
+            continue
+
+        work = [(root, 0)]
+        while work:
+            node, child_idx = work.pop()
+
+            if child_idx == 0:
+                index_of[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+
+            children = graph.get(node, [])
+            recurse = False
+            while child_idx < len(children):
+                child = children[child_idx]
+                child_idx += 1
+                if child not in index_of:
+                    work.append((node, child_idx))
+                    work.append((child, 0))
+                    recurse = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+
+            if recurse:
+                continue
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component[::-1])
+
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+    return components
+
+
+def find_expression_cycles(graph: dict[str, list[str]]) -> list[list[str]]:
+    return [
+        component
+        for component in strongly_connected_components(graph)
+        if len(component) > 1 or component[0] in graph.get(component[0], [])
+    ]
+
+
+def cycle_path(graph: dict[str, list[str]], component: list[str]) -> list[str]:
+    """
+    A closed path through a cyclic component, starting and ending at its
+    first member (breadth-first search restricted to the component).
+    """
+    start = component[0]
+    members = set(component)
+    previous: dict[str, str] = {}
+    queue = [start]
+
+    for node in queue:
+        for dep in graph.get(node, []):
+            if dep == start:
+                path = [start]
+                while node != start:
+                    path.append(node)
+                    node = previous[node]
+                return [start] + path[:0:-1] + [start]
+            if dep in members and dep not in previous:
+                previous[dep] = node
+                queue.append(dep)
+
+    return component + [start]
+
+
+def expression_evaluation_order(graph: dict[str, list[str]]) -> list[str]:
+    """
+    Expression registers ordered so every expression comes after the
+    expressions it references. Registers on (or depending on) a cycle are
+    left out, they cannot be evaluated.
+    """
+    blocked: set[str] = set()
+    order: list[str] = []
+
+    for component in strongly_connected_components(graph):
+        cyclic = len(component) > 1 or component[0] in graph.get(component[0], [])
+        if cyclic or any(dep in blocked for node in component for dep in graph.get(node, [])):
+            blocked.update(component)
+            continue
+        order.extend(component)
+
+    return order
@@ -0,0 +1,156 @@
+"""
+Incremental revalidation support.
+
+A file's validation result depends on its own content and, for cross-file
+checks, on other project files:
+    devices.json   -> the set of available files (missing reference check)
+    Precharge maps -> devices.json (contactorFeedback flag)
+    control maps   -> devices.json and every address map used with them
+
+Each file gets a fingerprint over its own content hash, role and map type
+and those of its dependencies. A cached result is reused while the fingerprint
+is unchanged, so an edit only revalidates the edited file and its dependents.
+
+Within a run, ContentMemo shares the results of the checks that depend only
+on a file's content (address maps, and the per-register part of control
+maps) between files with the same canonical content.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from helpers.io import canonical_hash, content_hash
+from validators.index import ProjectIndex, file_ref
+from validators.result import ValidationResult
+
+
+@dataclass(frozen=True)
+class DependencyGraph:
+    """
+    Maps each file name to the project files its validation reads.
+    """
+    dependencies: dict[str, tuple[str, ...]]
+
+    def dependents(self, file_name: str) -> list[str]:
+        return [name for name, deps in self.dependencies.items() if file_name in deps]
+
+
+def selection_hash(sel: dict) -> str:
+    if sel.get("hash") is None:
+        body = sel.get("bytes")
+        if body is None:
+            body = repr(sel.get("data")).encode("utf-8")
+        sel["hash"] = content_hash(body)
+    return sel["hash"]
+
+
+def build_dependency_graph(selections: list[dict], index: ProjectIndex) -> DependencyGraph:
+    devices_files = tuple(os.path.basename(s["name"]) for s in selections if s["role"] == "Devices")
+    dependencies: dict[str, tuple[str, ...]] = {}
+
+    for sel in selections:
+        file_key = os.path.basename(sel["name"])
+        deps: tuple[str, ...] = ()
+
+        if sel["role"] == "Control Map":
+            address_map_files = tuple(
+                f"{ref}.json"
+                for ref in index.address_maps_for_control_map(file_ref(file_key))
+                if index.has_file(f"{ref}.json")
+            )
+            deps = devices_files + address_map_files
+        elif sel["role"] == "Address Map" and sel.get("map_type") == "Precharge":
+            deps = devices_files
+
+        dependencies[file_key] = deps
+
+    return DependencyGraph(dependencies)
+
+
+def compute_fingerprints(selections: list[dict], graph: DependencyGraph, options: str = "") -> list[str]:
+    """
+    Fingerprint of every input a selection's result depends on. options holds
+    validation settings that change results (such as the error budget).
+    """
+    hashes = {os.path.basename(s["name"]): selection_hash(s) for s in selections}
+    # A dependency reassigned to another role or map type changes what is
+    # checked against it (a control map only sees address maps)
+    kinds = {os.path.basename(s["name"]): f"{s['role']}\0{s.get('map_type')}" for s in selections}
+    available_files = "\n".join(sorted(hashes))
+
+    fingerprints = []
+    for sel in selections:
+        file_key = os.path.basename(sel["name"])
+
+        h = hashlib.sha256()
+        h.update(f"{options}\0{sel['role']}\0{sel.get('map_type')}\0{hashes[file_key]}".encode("utf-8"))
+        for dep in graph.dependencies.get(file_key, ()):
+            h.update(f"\0{dep}={hashes.get(dep)}\0{kinds.get(dep)}".encode("utf-8"))
+        if sel["role"] == "Devices":
+            h.update(f"\0{available_files}".encode("utf-8"))
+
+        fingerprints.append(h.hexdigest())
+
+    return fingerprints
+
+
+class ResultCache:
+    """
+    Last validation result per file name, tagged with the fingerprint of the
+    inputs it was computed from.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[str, ValidationResult]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, file_name: str, fingerprint: str) -> Optional[ValidationResult]:
+        entry = self._entries.get(file_name)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[1]
+
+    def put(self, file_name: str, fingerprint: str, result: ValidationResult):
+        self._entries[file_name] = (fingerprint, result)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ContentMemo:
+    """
+    Validation results by canonical content plus the validation parameters,
+    so identical maps shipped under different file names are validated once.
+    Stored results are shared: callers must wrap them (see
+    merge_validation_results) before attaching anything to them.
+    """
+
+    def __init__(self):
+        self._canonical: dict[str, str] = {}
+        self._results: dict[tuple, ValidationResult] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, sel: dict, *params) -> tuple:
+        # Byte-identical copies skip re-serializing the payload
+        file_hash = selection_hash(sel)
+        canonical = self._canonical.get(file_hash)
+        if canonical is None:
+            canonical = canonical_hash(sel["data"])
+            self._canonical[file_hash] = canonical
+        return (canonical,) + params
+
+    def get(self, key: tuple) -> Optional[ValidationResult]:
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: tuple, result: ValidationResult):
+        self._results[key] = result
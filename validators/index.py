@@ -0,0 +1,96 @@
+from typing import Iterable, Optional
+
+from validators.registers import build_registers_by_name
+from validators.suggest import NameIndex, SegmentIndex
+
+
+def file_ref(file_name: str) -> str:
+    """
+    Reference used in devices.json for a project file ("inverter.json" -> "inverter").
+    """
+    return file_name[:-5] if file_name.lower().endswith(".json") else file_name
+
+
+class ProjectIndex:
+    """
+    Cross-file lookup tables for one validation run, built in a single pass
+    over the devices and address maps so that cross-file validators do not
+    rescan the project for every device or map.
+    """
+
+    def __init__(self, devices=None, address_maps_by_file: Optional[dict] = None, available_files: Iterable[str] = ()):
+        self.available_files: frozenset[str] = frozenset(available_files)
+
+        # (index in devices.json, device) for every device object
+        self.devices: list[tuple[int, dict]] = []
+        self.devices_by_address_map: dict[str, list[tuple[int, dict]]] = {}
+        self.devices_by_control_map: dict[str, list[tuple[int, dict]]] = {}
+        self.devices_by_type: dict[str, list[tuple[int, dict]]] = {}
+
+        if isinstance(devices, list):
+            for d_idx, device in enumerate(devices):
+                if not isinstance(device, dict):
+                    continue
+
+                entry = (d_idx, device)
+                self.devices.append(entry)
+
+                address_map = device.get("addressMap")
+                if isinstance(address_map, str) and address_map.strip() != "":
+                    self.devices_by_address_map.setdefault(address_map, []).append(entry)
+
+                control_map = device.get("controlMap")
+                if isinstance(control_map, str) and control_map.strip() != "":
+                    self.devices_by_control_map.setdefault(control_map, []).append(entry)
+
+                dtype = device.get("type")
+                if isinstance(dtype, str):
+                    self.devices_by_type.setdefault(dtype, []).append(entry)
+
+        self.registers_by_map: dict[str, dict[str, dict]] = {}
+        for file_name, registers in (address_maps_by_file or {}).items():
+            if isinstance(registers, list):
+                self.registers_by_map[file_name] = build_registers_by_name(registers)
+        # Built on first use: only maps with broken references need one
+        self._name_indexes: dict[str, NameIndex] = {}
+        self._segment_index = SegmentIndex()
+
+    def has_file(self, file_name: str) -> bool:
+        return file_name in self.available_files
+
+    def registers_by_name(self, address_map_file: str) -> Optional[dict[str, dict]]:
+        return self.registers_by_map.get(address_map_file)
+
+    def name_index(self, address_map_file: str) -> Optional[NameIndex]:
+        """
+        Fuzzy index over the register names of an address map, for "did you
+        mean" suggestions.
+        """
+        name_index = self._name_indexes.get(address_map_file)
+        if name_index is None:
+            registers_by_name = self.registers_by_map.get(address_map_file)
+            if registers_by_name is None:
+                return None
+            name_index = self._name_indexes[address_map_file] = NameIndex(registers_by_name, self._segment_index)
+        return name_index
+
+    def devices_with_address_map(self, address_map_ref: str) -> list[tuple[int, dict]]:
+        return self.devices_by_address_map.get(address_map_ref, [])
+
+    def devices_with_control_map(self, control_map_ref: str) -> list[tuple[int, dict]]:
+        return self.devices_by_control_map.get(control_map_ref, [])
+
+    def address_maps_for_control_map(self, control_map_ref: str) -> dict[str, list[tuple[int, dict]]]:
+        """
+        Distinct address maps used together with a control map, each with the
+        devices sharing that (control map, address map) pair, in device order.
+        """
+        pairs: dict[str, list[tuple[int, dict]]] = {}
+        for entry in self.devices_with_control_map(control_map_ref):
+            address_map_ref = entry[1].get("addressMap")
+            if isinstance(address_map_ref, str) and address_map_ref.strip() != "":
+                pairs.setdefault(address_map_ref, []).append(entry)
+        return pairs
+
+    def devices_of_type(self, device_type: str) -> list[tuple[int, dict]]:
+        return self.devices_by_type.get(device_type, [])
@@ -0,0 +1,103 @@
+"""
+Catalog of validation message codes and their text templates.
+
+Validators record a code plus an argument tuple; the text is only formatted
+(str.format with positional fields) when a message is displayed.
+"""
+
+TEXT = "text"
+
+MESSAGES = {
+    TEXT: "{}",
+    "result.truncated": "Error limit reached, remaining checks were skipped",
+
+    # Files and projects
+    "file.invalid_json": "Invalid JSON: {}",
+    "project.no_devices_file": "No devices file selected",
+    "project.multiple_devices_files": "Multiple devices files selected",
+    "project.no_config_file": "No config file selected",
+    "project.multiple_config_files": "Multiple config files selected",
+
+    # Address maps
+    "address_map.invalid_map_type": "Invalid map type '{}'",
+    "address_map.duplicate_register": "Duplicate register '{}'",
+    "address_map.register_not_object": "{} must be an object",
+    "address_map.invalid_expression": "Invalid expression in register '{}'",
+    "address_map.missing_communication_check": "Missing required register 'communicationCheck' for Modbus TCP/IP",
+    "register.missing_field": "Register '{}' missing '{}'",
+    "register.field_type": "Register '{}' field '{}' expected {}",
+    "register.optional_field_type": "Register '{}' optional field '{}' expected {}",
+    "register.out_of_range": "Register '{}' field '{}' must be between {} and {}",
+    "register.unknown_fields": "Register '{}' unknown fields: {}",
+    "register.missing_required": "Missing required register '{}'",
+    "register.invalid": "Invalid register '{}'",
+    "register.missing_required_field": "Register '{}' missing required field '{}'",
+    "register.unexpected_value": "Register '{}' field '{}' expected '{}', got '{}'",
+    "expression.missing_references": "Expression '{}' references missing registers: {}",
+    "expression.missing_references_suggestions": "Expression '{}' references missing registers: {} (did you mean {}?)",
+    "expression.self_reference": "Expression '{}' references itself",
+    "expression.cycle": "Expressions form a cycle: {}",
+    "expression.evaluation_order": "Expression evaluation order: {}",
+    "modbus.overlap": "Registers '{}' ({}-{}) and '{}' ({}-{}) overlap in function code {}",
+    "modbus.no_gaps": "Function code {}: no gaps",
+    "modbus.gaps": "Function code {}: {} gaps, {} unmapped registers ({})",
+    "modbus.read_plan": "Function code {}: {} read requests per poll register by register, {} in block reads",
+    "canbus.overrun": "Signal '{}' in CAN id {:#x} runs past byte 7 ({} bits from byte {} bit {}, {} endian)",
+    "canbus.overlap": "Signals '{}' and '{}' overlap in CAN id {:#x} (bits {})",
+    "canbus.utilization": "CAN id {:#x}: {}/{} bits used ({}%), {} signals",
+
+    # Devices
+    "device.duplicate_id": "Duplicate device id '{}'",
+    "device.missing_type": "Device '{}' missing 'type'",
+    "device.unknown_type": "Device '{}' has unknown device type '{}'",
+    "device.missing_field": "Device '{}' missing '{}'",
+    "device.field_type": "Device '{}' field '{}' expected {}",
+    "device.optional_field_type": "Device '{}' optional field '{}' expected {}",
+    "device.out_of_range": "Device '{}' field '{}' must be between {} and {}",
+    "device.unknown_fields": "Device '{}' unknown fields: {}",
+    "device.missing_address_map": "Device '{}' references missing address map file '{}.json'",
+    "device.missing_control_map": "Device '{}' references missing control map file '{}.json'",
+
+    # Config
+    "config.not_object": "Config must be an object",
+    "config.field_type": "Field '{}' expected {}",
+    "config.field_not_object": "Field '{}' must be an object",
+    "config.missing_key": "Missing '{}' in '{}'",
+    "config.unknown_fields": "Unknown fields at '{}': {}",
+
+    # Control maps
+    "control_map.not_list": "Control map file must be a list (or object), got {}",
+    "control_map.duplicate_name": "Duplicate control register name '{}'",
+    "control_map.not_object": "{} must be an object",
+    "control_map.missing_field": "Control register '{}' missing '{}'",
+    "control_map.field_type": "Control register '{}' field '{}' expected {}",
+    "control_map.unknown_fields": "Control register '{}' unknown fields: {}",
+    "control_map.missing_command": "{} control register '{}' references command '{}' which is missing from address map '{}'",
+    "control_map.missing_command_suggestions": "{} control register '{}' references command '{}' which is missing from address map '{}' (did you mean {}?)",
+    "command.empty": "Control register '{}' field 'commands' contains an empty command at position {}",
+    "command.read_with_value": "Control register '{}' read command '{}' must not contain '='",
+    "command.read_without_command": "Control register '{}' read command '{}' must have a command before '?'",
+    "command.write_incomplete": "Control register '{}' write command '{}' must have a command before '=' and a value after",
+    "command.write_with_read": "Control register '{}' write command '{}' must not have '?' in the command part",
+    "command.unknown": "Control register '{}' command '{}' must end with '?' (read) or contain '=' (write)",
+}
+
+# Compact numeric ids, so results can store codes in an array
+CODES = list(MESSAGES)
+CODE_IDS = {code: i for i, code in enumerate(CODES)}
+
+
+def format_message(code: str, args: tuple) -> str:
+    return MESSAGES[code].format(*args)
+
+
+def message_subject(code: str, args: tuple):
+    """
+    The register, device or control register a message is about: its first
+    argument when the template starts by naming it in quotes ("Register '{}' ...").
+    """
+    template = MESSAGES[code]
+    quoted = template.find("'{}'")
+    if args and quoted >= 0 and quoted == template.find("{") - 1:
+        return args[0]
+    return None
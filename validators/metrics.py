@@ -0,0 +1,57 @@
+"""
+Opt-in instrumentation of validator runs.
+
+A Recorder times each validator call made for one file and counts the
+items it processed and the messages it emitted. The pipeline only uses a
+real Recorder when instrumentation is requested; otherwise NULL_RECORDER
+calls the validators directly.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from validators.result import ValidationResult
+
+
+@dataclass(frozen=True)
+class Measurement:
+    validator: str
+    file: Optional[str]     # None for project-level steps
+    seconds: float
+    items: int              # registers, devices, ... processed
+    unit: str
+    messages: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Recorder:
+    def __init__(self, file: Optional[str] = None):
+        self.file = file
+        self.measurements: list[Measurement] = []
+
+    def add(self, validator: str, seconds: float, items: int = 0, unit: str = "", messages: int = 0):
+        self.measurements.append(Measurement(validator, self.file, seconds, items, unit, messages))
+
+    def run(self, validator: str, fn: Callable[..., ValidationResult], *args, items: int = 0, unit: str = "", **kwargs) -> ValidationResult:
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.add(validator, time.perf_counter() - start, items, unit, result.total)
+        return result
+
+
+class _NullRecorder(Recorder):
+    def add(self, *args, **kwargs):
+        pass
+
+    def run(self, validator: str, fn: Callable[..., ValidationResult], *args, items: int = 0, unit: str = "", **kwargs) -> ValidationResult:
+        return fn(*args, **kwargs)
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def count_items(data) -> int:
+    return len(data) if isinstance(data, (list, dict)) else 0
@@ -0,0 +1,243 @@
+"""
+Modbus TCP/IP address map analysis on compact register spans.
+
+A span is a (function_code, start, end, name) tuple, where end is exclusive
+(start + numberOfRegisters). Spans are collected while walking the address
+map so these checks never need the full register dicts.
+
+plan_reads coalesces the spans of the read function codes into block reads.
+Without a plan the controller reads every register with its own request,
+except that adjacent registers flagged multiRead are read together.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Collection, Iterable, Optional
+
+from validators.result import ValidationResult
+
+Span = tuple[int, int, int, str]
+
+MAX_LISTED_GAPS = 10
+
+# Addresses per request of the read function codes: coils and discrete
+# inputs are read in bits, holding and input registers in 16-bit registers
+READ_LIMITS = {1: 2000, 2: 2000, 3: 125, 4: 125}
+
+
+def register_span(reg: dict) -> Optional[Span]:
+    function_code = reg.get("functionCode")
+    address = reg.get("address")
+    count = reg.get("numberOfRegisters")
+
+    for value in (function_code, address, count):
+        if not isinstance(value, int) or isinstance(value, bool):
+            return None
+    if count < 1:
+        return None
+
+    return (function_code, address, address + count, reg.get("name"))
+
+
+def _spans_by_function_code(spans: Iterable[Span]) -> dict[int, list[Span]]:
+    grouped: dict[int, list[Span]] = {}
+    for span in spans:
+        grouped.setdefault(span[0], []).append(span)
+    for group in grouped.values():
+        group.sort(key=lambda s: (s[1], s[2]))
+    return grouped
+
+
+def find_register_overlaps(spans: Iterable[Span]) -> list[tuple[Span, Span]]:
+    """
+    Every pair of spans sharing a function code whose address ranges overlap.
+
+    Sweep over the spans sorted by start address with a min-heap of the
+    ranges still open, so the cost is O(n log n + number of overlaps).
+    """
+    overlaps: list[tuple[Span, Span]] = []
+
+    for function_code, group in sorted(_spans_by_function_code(spans).items()):
+        active: list[tuple[int, int, Span]] = []  # (end, order, span)
+        for order, span in enumerate(group):
+            start = span[1]
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for _, _, other in sorted(active, key=lambda a: a[1]):
+                overlaps.append((other, span))
+            heapq.heappush(active, (span[2], order, span))
+
+    return overlaps
+
+
+def find_register_gaps(spans: Iterable[Span]) -> dict[int, list[tuple[int, int]]]:
+    """
+    Unmapped address ranges (start, end exclusive) between the lowest and
+    highest mapped address of each function code.
+    """
+    gaps: dict[int, list[tuple[int, int]]] = {}
+
+    for function_code, group in sorted(_spans_by_function_code(spans).items()):
+        fc_gaps = []
+        covered_until = group[0][2]
+        for _, start, end, _ in group[1:]:
+            if start > covered_until:
+                fc_gaps.append((covered_until, start))
+            covered_until = max(covered_until, end)
+        gaps[function_code] = fc_gaps
+
+    return gaps
+
+
+@dataclass(frozen=True)
+class ReadBlock:
+    function_code: int
+    start: int
+    end: int  # exclusive
+    names: tuple[str, ...]
+    # Addresses of the block that belong to a register, the rest are gaps read along
+    mapped: int
+
+    @property
+    def count(self) -> int:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class ReadPlan:
+    max_gap: int
+    blocks: tuple[ReadBlock, ...]
+    # Requests per poll by function code when reading register by register
+    requests_before: dict[int, int]
+
+    @property
+    def requests_after(self) -> dict[int, int]:
+        after = {function_code: 0 for function_code in self.requests_before}
+        for block in self.blocks:
+            after[block.function_code] += 1
+        return after
+
+    def to_dict(self) -> dict:
+        after = self.requests_after
+        return {
+            "max_gap": self.max_gap,
+            "requests_before": sum(self.requests_before.values()),
+            "requests_after": sum(after.values()),
+            "function_codes": [
+                {
+                    "function_code": function_code,
+                    "requests_before": before,
+                    "requests_after": after[function_code],
+                    "blocks": [
+                        {"start": b.start, "count": b.count, "unmapped": b.count - b.mapped, "registers": list(b.names)}
+                        for b in self.blocks
+                        if b.function_code == function_code
+                    ],
+                }
+                for function_code, before in sorted(self.requests_before.items())
+            ],
+        }
+
+
+def _chunks(count: int, limit: int) -> int:
+    return -(-count // limit)
+
+
+def _requests_register_by_register(group: list[Span], limit: int, multi_read: Collection[str]) -> int:
+    requests = 0
+    run_start = run_end = None
+    for _, start, end, name in group:
+        if name in multi_read:
+            if run_end == start and end - run_start <= limit:
+                run_end = end
+                continue
+            run_start, run_end = start, end
+        else:
+            run_start = run_end = None
+        requests += _chunks(end - start, limit)
+    return requests
+
+
+def _coalesce(function_code: int, group: list[Span], limit: int, max_gap: int) -> list[ReadBlock]:
+    """
+    Greedy left to right: a block takes the next register while the gap
+    before it is at most max_gap and the block stays within limit. For
+    registers that do not overlap this gives the fewest blocks.
+    """
+    blocks: list[ReadBlock] = []
+    block_start = block_end = None
+    names: list[str] = []
+    mapped = 0
+
+    for _, start, end, name in group:
+        if block_start is not None and start - block_end <= max_gap and max(block_end, end) - block_start <= limit:
+            mapped += max(0, end - max(start, block_end))
+            block_end = max(block_end, end)
+            names.append(name)
+            continue
+
+        if block_start is not None:
+            blocks.append(ReadBlock(function_code, block_start, block_end, tuple(names), mapped))
+            block_start = None
+
+        if end - start > limit:
+            # Longer than one request allows: read in consecutive chunks
+            for chunk_start in range(start, end, limit):
+                chunk_end = min(end, chunk_start + limit)
+                blocks.append(ReadBlock(function_code, chunk_start, chunk_end, (name,), chunk_end - chunk_start))
+            continue
+
+        block_start, block_end, names, mapped = start, end, [name], end - start
+
+    if block_start is not None:
+        blocks.append(ReadBlock(function_code, block_start, block_end, tuple(names), mapped))
+
+    return blocks
+
+
+def plan_reads(spans: Iterable[Span], max_gap: int = 0, multi_read: Collection[str] = ()) -> ReadPlan:
+    """
+    Fewest block reads per poll covering every span of a read function code
+    (1-4), within READ_LIMITS per request. Up to max_gap unmapped addresses
+    between two registers are read along rather than starting a new request;
+    the device must answer reads of those addresses. multi_read holds the
+    names of the registers flagged multiRead, for the requests per poll
+    without the plan.
+    """
+    blocks: list[ReadBlock] = []
+    requests_before: dict[int, int] = {}
+
+    for function_code, group in sorted(_spans_by_function_code(spans).items()):
+        limit = READ_LIMITS.get(function_code)
+        if limit is None:
+            continue
+        requests_before[function_code] = _requests_register_by_register(group, limit, multi_read)
+        blocks.extend(_coalesce(function_code, group, limit, max_gap))
+
+    return ReadPlan(max_gap, tuple(blocks), requests_before)
+
+
+def validate_register_overlaps(spans: list[Span], include_summary: bool = False, multi_read: Collection[str] = ()) -> ValidationResult:
+    result = ValidationResult([])
+
+    for first, second in find_register_overlaps(spans):
+        result.emit("warning", "modbus.overlap", first[3], first[1], first[2] - 1, second[3], second[1], second[2] - 1, first[0])
+
+    if include_summary:
+        for function_code, fc_gaps in find_register_gaps(spans).items():
+            if not fc_gaps:
+                result.emit("info", "modbus.no_gaps", function_code)
+                continue
+
+            unmapped = sum(end - start for start, end in fc_gaps)
+            listed = ", ".join(f"{start}-{end - 1}" for start, end in fc_gaps[:MAX_LISTED_GAPS])
+            if len(fc_gaps) > MAX_LISTED_GAPS:
+                listed += f", ... ({len(fc_gaps) - MAX_LISTED_GAPS} more)"
+            result.emit("info", "modbus.gaps", function_code, len(fc_gaps), unmapped, listed)
+
+        plan = plan_reads(spans, multi_read=multi_read)
+        after = plan.requests_after
+        for function_code, before in plan.requests_before.items():
+            result.emit("info", "modbus.read_plan", function_code, before, after[function_code])
+
+    return result
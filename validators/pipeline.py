@@ -0,0 +1,481 @@
+"""
+Streamlit-free full project validation.
+
+Runs the same per-file and cross-file checks as the Full Project page on a
+list of selections, where each selection is a dict with:
+    name        file name (as shown to the user)
+    role        one of FILE_ROLES
+    map_type    address map type for "Address Map" files, else None
+    data        parsed JSON payload
+    parse_error JSON decoding error message, or None
+    hash        content hash of the file body (optional, used for caching)
+    confidence  classifier confidence of the detected role and map type
+                (optional, 1.0 when given explicitly)
+    size        file size in bytes (optional, for instrumentation)
+    parse_seconds  JSON decoding time (optional, for instrumentation)
+
+max_errors caps the errors reported per file (1 = fail fast); files that
+hit it stop early and carry a truncation notice. With instrument=True
+every file result carries validators.metrics measurements (JSON parse
+time when the selection has "parse_seconds", then each validator call, or
+a "(cached)" entry for results served from the cache).
+"""
+
+import os
+import posixpath
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from helpers.io import ParseCache, content_hash
+from validators.result import ValidationResult, merge_validation_results
+from validators.registry import get_validator, validators_for_role
+from validators.classifier import classify
+from validators.index import ProjectIndex
+from validators.incremental import ContentMemo, ResultCache, build_dependency_graph, compute_fingerprints
+from validators.metrics import NULL_RECORDER, Recorder, count_items
+
+FILE_ROLES = ["Config", "Devices", "Address Map", "Control Map"]
+DEFAULT_MAP_TYPE = "Modbus TCP/IP"
+# Below this the classifier is ignored in favour of the file name guess
+MIN_CONFIDENCE = 0.5
+
+
+def guess_role(name: str) -> str:
+    name = os.path.basename(name)
+    if name == "config.json":
+        return "Config"
+    if name == "devices.json":
+        return "Devices"
+    if "control" in name:
+        return "Control Map"
+    return "Address Map"
+
+
+def detect_file_type(name: str, data, default_map_type: str = DEFAULT_MAP_TYPE) -> tuple[str, Optional[str], float]:
+    """
+    (role, map_type, confidence) of a parsed file from its content, falling
+    back to the file name and default_map_type when the classifier is not
+    confident enough. An address map whose type is ambiguous gets
+    default_map_type when it is one of the candidates, else the first one.
+    """
+    detected = classify(data)
+    if detected.role is not None and detected.confidence >= MIN_CONFIDENCE:
+        map_type = detected.map_type
+        if map_type is None and detected.candidates:
+            map_type = default_map_type if default_map_type in detected.candidates else detected.candidates[0]
+        return detected.role, map_type, detected.confidence
+
+    role = guess_role(name)
+    return role, default_map_type if role == "Address Map" else None, detected.confidence
+
+
+def build_selections(
+    items: list[dict],
+    roles: Optional[dict[str, str]] = None,
+    map_types: Optional[dict[str, str]] = None,
+    default_map_type: str = DEFAULT_MAP_TYPE,
+    detect: bool = True,
+) -> list[dict]:
+    """
+    Selections for {"name", "bytes"} file items with parsed JSON payloads.
+    Roles and map types given in roles / map_types win; the others are
+    detected from the content (detect=True) or guessed from the file name.
+    """
+    roles = roles or {}
+    map_types = map_types or {}
+    parse_cache = ParseCache()
+    selections: list[dict] = []
+
+    for item in items:
+        name = item["name"]
+        file_hash = content_hash(item["bytes"])
+        start = time.perf_counter()
+        data, parse_error = parse_cache.parse(item["bytes"], file_hash)
+        parse_seconds = time.perf_counter() - start
+
+        if detect and parse_error is None:
+            role, map_type, confidence = detect_file_type(name, data, default_map_type)
+        else:
+            role, map_type, confidence = guess_role(name), default_map_type, 0.0
+
+        # Overrides may name a file by its path or just its file name
+        base = os.path.basename(name)
+        role_override = roles.get(name, roles.get(base))
+        map_type_override = map_types.get(name, map_types.get(base))
+        if role_override is not None:
+            role, confidence = role_override, 1.0
+        if role != "Address Map":
+            map_type = None
+        elif map_type_override is not None:
+            map_type = map_type_override
+        elif map_type is None:
+            map_type = default_map_type
+
+        selections.append({
+            "name": name,
+            "role": role,
+            "map_type": map_type,
+            "confidence": confidence,
+            "data": data,
+            "parse_error": parse_error,
+            "hash": file_hash,
+            "size": len(item["bytes"]),
+            "parse_seconds": parse_seconds,
+        })
+
+    return selections
+
+
+def group_sites(names: list[str]) -> dict[str, list[str]]:
+    """
+    Split the file paths of a multi-site archive or directory into sites.
+    Every folder holding a devices.json is a site and each file belongs to
+    the deepest site folder containing it; files outside all of them form
+    the "" site. With at most one devices.json everything is one site.
+    """
+    site_folders = sorted(
+        {posixpath.dirname(name) for name in names if posixpath.basename(name) == "devices.json"},
+        key=len,
+        reverse=True,
+    )
+    if len(site_folders) <= 1:
+        return {"": list(names)}
+
+    sites: dict[str, list[str]] = {}
+    for name in names:
+        site = next((folder for folder in site_folders if folder and name.startswith(folder + "/")), "")
+        sites.setdefault(site, []).append(name)
+    return sites
+
+
+@dataclass
+class ProjectContext:
+    """
+    Cross-file inputs shared by every per-file validation of a project.
+    """
+    available_files: set[str]
+    devices_payload: object = None
+    address_maps_by_file: dict[str, object] = field(default_factory=dict)
+    index: Optional[ProjectIndex] = None
+    max_errors: Optional[int] = None
+    instrument: bool = False
+    # Per process: pool workers each fill their own copy
+    memo: ContentMemo = field(default_factory=ContentMemo)
+
+
+@dataclass
+class FileReport:
+    name: str
+    role: str
+    map_type: Optional[str]
+    result: ValidationResult
+    confidence: Optional[float] = None
+
+
+@dataclass
+class ProjectReport:
+    """
+    Project-level messages plus one report per validated file.
+    """
+    project: ValidationResult
+    files: list[FileReport]
+    revalidated: list[str] = field(default_factory=list)
+
+    @property
+    def has_errors(self) -> bool:
+        return self.project.has_errors or any(f.result.has_errors for f in self.files)
+
+    @property
+    def has_warnings(self) -> bool:
+        return self.project.has_warnings or any(f.result.has_warnings for f in self.files)
+
+    def measurements(self) -> list:
+        """
+        Measurements of an instrumented run: project-level steps first, then
+        every file in order.
+        """
+        measurements = list(self.project.iter_measurements())
+        for f in self.files:
+            measurements.extend(f.result.iter_measurements())
+        return measurements
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable form of the report, as returned by the HTTP API.
+        """
+        def messages(result: ValidationResult) -> list[dict]:
+            return [{"level": m.level, "code": m.code, "message": m.message} for m in result.iter_messages()]
+
+        def status(result) -> str:
+            return "errors" if result.has_errors else "warnings" if result.has_warnings else "valid"
+
+        report = {
+            "status": status(self),
+            "project": messages(self.project),
+            "files": [
+                {
+                    "name": f.name,
+                    "role": f.role,
+                    "map_type": f.map_type,
+                    "confidence": f.confidence,
+                    "status": status(f.result),
+                    "truncated": f.result.truncated,
+                    "messages": messages(f.result),
+                }
+                for f in self.files
+            ],
+        }
+
+        measurements = self.measurements()
+        if measurements:
+            report["measurements"] = [m.to_dict() for m in measurements]
+
+        return report
+
+
+def build_project_context(selections: list[dict], max_errors: Optional[int] = None) -> tuple[ProjectContext, ValidationResult]:
+    result = ValidationResult([])
+
+    device_files = [s for s in selections if s["role"] == "Devices"]
+    if len(device_files) == 0:
+        result.emit("error", "project.no_devices_file")
+    elif len(device_files) > 1:
+        result.emit("error", "project.multiple_devices_files")
+
+    config_files = [s for s in selections if s["role"] == "Config"]
+    if len(config_files) == 0:
+        result.emit("error", "project.no_config_file")
+    elif len(config_files) > 1:
+        result.emit("error", "project.multiple_config_files")
+
+    context = ProjectContext(available_files={os.path.basename(s["name"]) for s in selections}, max_errors=max_errors)
+
+    for sel in selections:
+        if sel.get("parse_error") is not None:
+            continue
+
+        file_key = os.path.basename(sel["name"])
+        if sel["role"] == "Devices":
+            context.devices_payload = sel["data"]
+        elif sel["role"] == "Address Map":
+            context.address_maps_by_file[file_key] = sel["data"]
+
+    context.index = ProjectIndex(context.devices_payload, context.address_maps_by_file, context.available_files)
+
+    return context, result
+
+
+def _memoized(context: ProjectContext, recorder: Recorder, key: tuple, validator: str, fn, *args, items: int = 0, unit: str = "", **kwargs) -> ValidationResult:
+    """
+    Run a content-only validator once per memo key. The returned result is
+    shared between files and must be wrapped before it is returned.
+    """
+    result = context.memo.get(key)
+    if result is None:
+        result = recorder.run(validator, fn, *args, items=items, unit=unit, **kwargs)
+        context.memo.put(key, result)
+    else:
+        recorder.add(f"{validator} (memoized)", 0.0, items, unit, result.total)
+    return result
+
+
+def _validate_selection(sel: dict, context: ProjectContext, recorder: Recorder) -> ValidationResult:
+    if sel.get("parse_error") is not None:
+        result = ValidationResult([])
+        result.emit("error", "file.invalid_json", sel["parse_error"])
+        return result
+
+    data = sel["data"]
+    items = count_items(data)
+    max_errors = context.max_errors
+
+    if sel["role"] == "Devices":
+        validate_devices, find_missing_device_references = validators_for_role("Devices")
+        devices_result = recorder.run("validate_devices", validate_devices, data, max_errors, items=items, unit="devices")
+        if devices_result.exhausted:
+            # The reference check is skipped
+            devices_result.truncate()
+            return devices_result
+        refs_result = recorder.run(
+            "find_missing_device_references",
+            find_missing_device_references,
+            data,
+            context.available_files,
+            index=context.index,
+            max_errors=devices_result.errors_left,
+            items=items,
+            unit="devices",
+        )
+        return merge_validation_results(devices_result, refs_result)
+
+    if sel["role"] == "Config":
+        validate_config, = validators_for_role("Config")
+        return recorder.run("validate_config", validate_config, data, max_errors, items=items, unit="keys")
+
+    if sel["role"] == "Control Map":
+        validate_control_maps, validate_control_map_commands = validators_for_role("Control Map")
+        key = context.memo.key(sel, "Control Map")
+        base_result = _memoized(context, recorder, key, "validate_control_maps", validate_control_maps, data, max_errors, items=items, unit="control registers")
+        if base_result.exhausted:
+            # The command check is skipped; base_result is shared, so the
+            # notice goes on the wrapper
+            result = merge_validation_results(base_result)
+            if not base_result.truncated:
+                result.truncate()
+            return result
+        cross_result = recorder.run(
+            "validate_control_map_commands",
+            validate_control_map_commands,
+            control_map_file=sel["name"],
+            control_map=data,
+            devices=context.devices_payload,
+            address_maps_by_file=context.address_maps_by_file,
+            index=context.index,
+            items=items,
+            unit="control registers",
+        )
+        return merge_validation_results(base_result, cross_result)
+
+    validate_address_map, = validators_for_role("Address Map")
+    precharge_contactor_feedback = False
+    if sel["map_type"] == "Precharge" and isinstance(context.devices_payload, list):
+        address_map_file = os.path.basename(sel["name"])
+        precharge_contactor_feedback = get_validator("get_precharge_contactor_feedback")(context.devices_payload, address_map_file, index=context.index)
+
+    key = context.memo.key(sel, sel["map_type"], precharge_contactor_feedback)
+    result = _memoized(
+        context,
+        recorder,
+        key,
+        "validate_address_map",
+        validate_address_map,
+        data,
+        sel["map_type"],
+        precharge_contactor_feedback,
+        max_errors=max_errors,
+        items=items,
+        unit="registers",
+    )
+    return merge_validation_results(result)
+
+
+def _file_recorder(sel: dict) -> Recorder:
+    recorder = Recorder(sel["name"])
+    if sel.get("parse_seconds") is not None:
+        size = sel["size"] if "size" in sel else len(sel.get("bytes") or b"")
+        recorder.add("json.parse", sel["parse_seconds"], size, "bytes")
+    return recorder
+
+
+def validate_selection(sel: dict, context: ProjectContext) -> ValidationResult:
+    if not context.instrument:
+        return _validate_selection(sel, context, NULL_RECORDER)
+
+    recorder = _file_recorder(sel)
+    result = _validate_selection(sel, context, recorder)
+    result.measurements = recorder.measurements + result.measurements
+    return result
+
+
+# Process pool workers receive the project context once, through the pool
+# initializer, instead of once per file.
+_worker_context: Optional[ProjectContext] = None
+
+
+def _init_worker(context: ProjectContext):
+    global _worker_context
+    _worker_context = context
+
+
+def _validate_in_worker(sel: dict) -> ValidationResult:
+    return validate_selection(sel, _worker_context)
+
+
+def validate_project(
+    selections: list[dict],
+    jobs: int = 1,
+    cache: Optional[ResultCache] = None,
+    max_errors: Optional[int] = None,
+    instrument: bool = False,
+) -> ProjectReport:
+    """
+    Validate every selection. With a cache, only files whose inputs changed
+    since the cached run (or that depend on a changed file) are revalidated.
+    """
+    started = time.perf_counter()
+    recorder = Recorder() if instrument else NULL_RECORDER
+
+    context, project_result = build_project_context(selections, max_errors)
+    context.instrument = instrument
+    recorder.add("build_project_context", time.perf_counter() - started, len(selections), "files", project_result.total)
+
+    results: list[Optional[ValidationResult]] = [None] * len(selections)
+    fingerprints: list[Optional[str]] = [None] * len(selections)
+
+    if cache is not None:
+        graph = build_dependency_graph(selections, context.index)
+        fingerprints = compute_fingerprints(selections, graph, f"max_errors={max_errors}\0instrument={instrument}")
+        for i, sel in enumerate(selections):
+            cached = cache.get(sel["name"], fingerprints[i])
+            if cached is None:
+                continue
+            # Cached results are shared between runs and carry no timings;
+            # this run's go on a wrapper, as for memoized results
+            results[i] = merge_validation_results(cached)
+            if instrument:
+                file_recorder = _file_recorder(sel)
+                file_recorder.add("validate_selection (cached)", 0.0, count_items(sel.get("data")), "", cached.total)
+                results[i].measurements = file_recorder.measurements
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    pending_selections = [selections[i] for i in pending]
+
+    if jobs > 1 and len(pending_selections) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(pending_selections) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(context,)) as pool:
+            fresh = list(pool.map(_validate_in_worker, pending_selections, chunksize=chunksize))
+    else:
+        fresh = [validate_selection(sel, context) for sel in pending_selections]
+
+    for i, result in zip(pending, fresh):
+        results[i] = result
+        if cache is not None:
+            # The timings belong to this run only
+            results[i] = merge_validation_results(result)
+            results[i].measurements, result.measurements = result.measurements, []
+            cache.put(selections[i]["name"], fingerprints[i], result)
+
+    files = [
+        FileReport(sel["name"], sel["role"], sel.get("map_type"), result, sel.get("confidence"))
+        for sel, result in zip(selections, results)
+    ]
+
+    recorder.add("validate_project", time.perf_counter() - started, len(selections), "files", project_result.total + sum(r.total for r in results))
+    project_result.measurements = recorder.measurements
+
+    return ProjectReport(project_result, files, [selections[i]["name"] for i in pending])
+
+
+def validate_source(
+    source,
+    roles: Optional[dict[str, str]] = None,
+    map_types: Optional[dict[str, str]] = None,
+    default_map_type: str = DEFAULT_MAP_TYPE,
+    detect: bool = True,
+    **options,
+) -> dict[str, ProjectReport]:
+    """
+    Validate every site of a helpers.io ZipSource / DirectorySource. Files
+    are read one site at a time, so only one site's file bodies are held in
+    memory. options are passed on to validate_project.
+    """
+    reports: dict[str, ProjectReport] = {}
+    for site, names in group_sites(source.names).items():
+        items = [{"name": name, "bytes": source.read(name)} for name in names]
+        selections = build_selections(items, roles, map_types, default_map_type, detect)
+        del items
+        reports[site] = validate_project(selections, **options)
+    return reports
@@ -1,35 +1,46 @@
+from typing import Optional
+
 from validators.result import ValidationResult
-from validators.registers import build_registers_by_name
+from validators.index import ProjectIndex, file_ref
+from validators.commands import INVALID, parse_commands
+from validators.suggest import format_suggestions
 
 
-def find_missing_device_references(devices, available_files: set[str]) -> ValidationResult:
-    result = ValidationResult([])
+def find_missing_device_references(
+    devices,
+    available_files: set[str],
+    index: Optional[ProjectIndex] = None,
+    max_errors: Optional[int] = None,
+) -> ValidationResult:
+    result = ValidationResult([], max_errors=max_errors)
 
     if not isinstance(devices, list):
         return result
 
-    for d_idx, device in enumerate(devices):
-        if not isinstance(device, dict):
-            continue
+    if index is None:
+        index = ProjectIndex(devices, available_files=available_files)
+
+    for d_idx, device in index.devices:
+        if result.exhausted:
+            result.truncate()
+            break
 
         device_id = device.get("id", f"device[{d_idx}]")
 
         address_map = device.get("addressMap")
         if isinstance(address_map, str):
-            expected = f"{address_map}.json"
-            if expected not in available_files:
-                result.add("error", f"Device '{device_id}' references missing address map file '{address_map}.json'")
+            if not index.has_file(f"{address_map}.json"):
+                result.emit("error", "device.missing_address_map", device_id, address_map)
 
         control_map = device.get("controlMap")
         if isinstance(control_map, str) and control_map.strip() != "":
-            expected = f"{control_map}.json"
-            if expected not in available_files:
-                result.add("error", f"Device '{device_id}' references missing control map file '{control_map}.json'")
+            if not index.has_file(f"{control_map}.json"):
+                result.emit("error", "device.missing_control_map", device_id, control_map)
 
     return result
 
 
-def validate_control_map_commands(*, control_map_file, control_map, devices, address_maps_by_file) -> ValidationResult:
+def validate_control_map_commands(*, control_map_file, control_map, devices, address_maps_by_file, index: Optional[ProjectIndex] = None) -> ValidationResult:
     result = ValidationResult([])
 
     if not isinstance(devices, list):
@@ -38,60 +49,49 @@ def validate_control_map_commands(*, control_map_file, control_map, devices, add
     if not isinstance(control_map, list):
         return result
 
-    if isinstance(control_map_file, str) and control_map_file.lower().endswith(".json"):
-        control_map_ref = control_map_file[:-5]
+    if index is None:
+        index = ProjectIndex(devices, address_maps_by_file)
 
-    for d_idx, device in enumerate(devices):
-        if not isinstance(device, dict):
-            continue
+    control_map_ref = file_ref(control_map_file)
 
-        device_control_map_ref = device.get("controlMap")
-        if not isinstance(device_control_map_ref, str) or device_control_map_ref.strip() == "":
+    # Command references come from the shared (cached) command parse and are
+    # checked once per distinct (control map, address map) pair.
+    references: list[tuple[str, str]] = []
+    for cm_idx, cm in enumerate(control_map):
+        if not isinstance(cm, dict):
             continue
 
-        if device_control_map_ref != control_map_ref:
+        cm_name = cm.get("name", f"register[{cm_idx}]")
+        commands = cm.get("commands")
+        if not isinstance(commands, str) or commands.strip() == "":
             continue
 
-        device_id = device.get("id", f"device[{d_idx}]")
-
-        address_map_ref = device.get("addressMap")
-        if not isinstance(address_map_ref, str) or address_map_ref.strip() == "":
-            continue
+        for command in parse_commands(commands):
+            if command.kind != INVALID:
+                references.append((cm_name, command.base))
 
-        address_map_file = f"{address_map_ref}.json"
-        address_map = address_maps_by_file.get(address_map_file)
-        if not isinstance(address_map, list):
+    for address_map_ref, pair_devices in index.address_maps_for_control_map(control_map_ref).items():
+        registers_by_name = index.registers_by_name(f"{address_map_ref}.json")
+        if registers_by_name is None:
             continue
 
-        registers_by_name = build_registers_by_name(address_map)
-
-        for cm_idx, cm in enumerate(control_map):
-            if not isinstance(cm, dict):
-                continue
+        device_ids = [device.get("id", f"device[{d_idx}]") for d_idx, device in pair_devices]
+        if len(device_ids) == 1:
+            subject = f"Device '{device_ids[0]}'"
+        else:
+            subject = "Devices " + ", ".join(f"'{device_id}'" for device_id in device_ids)
 
-            cm_name = cm.get("name", f"register[{cm_idx}]")
-            commands = cm.get("commands")
-            if not isinstance(commands, str) or commands.strip() == "":
+        for cm_name, base in references:
+            if base in registers_by_name:
                 continue
 
-            tokens = [t.strip() for t in commands.split("|")]
-            for token in tokens:
-                if token == "":
-                    continue
-
-                base = None
-                if token.endswith("?"):
-                    base = token[:-1].strip()
-                elif "=" in token:
-                    base = token.split("=", 1)[0].strip()
+            suggestions = index.name_index(f"{address_map_ref}.json").suggest(base)
+            if suggestions:
+                result.emit(
+                    "warning", "control_map.missing_command_suggestions",
+                    subject, cm_name, base, address_map_ref, format_suggestions(suggestions),
+                )
+            else:
+                result.emit("warning", "control_map.missing_command", subject, cm_name, base, address_map_ref)
 
-                if not base:
-                    continue
-
-                if base not in registers_by_name:
-                    result.add(
-                        "warning",
-                        f"Device '{device_id}' control register '{cm_name}' references command '{base}' which is missing from address map '{address_map_ref}'",
-                    )
-
-    return result
\ No newline at end of file
+    return result
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from validators.result import ValidationResult
 
 
@@ -18,8 +20,8 @@ def build_registers_by_name(registers) -> dict[str, dict]:
     return registers_by_name
 
 
-def validate_required_registers(registers_by_name, required) -> ValidationResult:
-    result = ValidationResult([])
+def validate_required_registers(registers_by_name, required, max_errors: Optional[int] = None) -> ValidationResult:
+    result = ValidationResult([], max_errors=max_errors)
 
     if not isinstance(required, list):
         return result
@@ -31,20 +33,20 @@ def validate_required_registers(registers_by_name, required) -> ValidationResult
         register_name, field_name, expected_value = req
 
         if register_name not in registers_by_name:
-            result.add("error", f"Missing required register '{register_name}'")
+            result.emit("error", "register.missing_required", register_name)
             continue
 
         reg = registers_by_name.get(register_name)
         if not isinstance(reg, dict):
-            result.add("error", f"Invalid register '{register_name}'")
+            result.emit("error", "register.invalid", register_name)
             continue
 
         if field_name not in reg:
-            result.add("error", f"Register '{register_name}' missing required field '{field_name}'")
+            result.emit("error", "register.missing_required_field", register_name, field_name)
             continue
 
         actual_value = reg.get(field_name)
         if actual_value != expected_value:
-            result.add("error", f"Register '{register_name}' field '{field_name}' expected '{expected_value}', got '{actual_value}'")
+            result.emit("error", "register.unexpected_value", register_name, field_name, expected_value, actual_value)
 
     return result
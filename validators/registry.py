@@ -0,0 +1,43 @@
+"""
+Registry of validators by file role.
+
+Validators are referenced as "module:function" strings and imported on
+first use, so importing the pipeline (the CLI, the HTTP API or a page)
+does not load every validator module and schema up front.
+"""
+
+import importlib
+from typing import Callable
+
+VALIDATORS = {
+    "validate_address_map": "validators.address_map:validate_address_map",
+    "get_precharge_contactor_feedback": "validators.address_map:get_precharge_contactor_feedback",
+    "validate_devices": "validators.devices:validate_devices",
+    "validate_config": "validators.config:validate_config",
+    "validate_control_maps": "validators.control_map:validate_control_maps",
+    "find_missing_device_references": "validators.project:find_missing_device_references",
+    "validate_control_map_commands": "validators.project:validate_control_map_commands",
+}
+
+# Validators run for a file, in order, by file role
+ROLE_VALIDATORS = {
+    "Config": ("validate_config",),
+    "Devices": ("validate_devices", "find_missing_device_references"),
+    "Address Map": ("validate_address_map",),
+    "Control Map": ("validate_control_maps", "validate_control_map_commands"),
+}
+
+_loaded: dict[str, Callable] = {}
+
+
+def get_validator(name: str) -> Callable:
+    validator = _loaded.get(name)
+    if validator is None:
+        module_name, _, attr = VALIDATORS[name].partition(":")
+        validator = getattr(importlib.import_module(module_name), attr)
+        _loaded[name] = validator
+    return validator
+
+
+def validators_for_role(role: str) -> list[Callable]:
+    return [get_validator(name) for name in ROLE_VALIDATORS[role]]
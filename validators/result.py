@@ -1,40 +1,158 @@
+from array import array
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List, Optional
+
+from validators.messages import CODES, CODE_IDS, TEXT, format_message
+
+LEVELS = ("error", "warning", "info", "success")
+_LEVEL_IDS = {level: i for i, level in enumerate(LEVELS)}
+_ERROR = _LEVEL_IDS["error"]
+_WARNING = _LEVEL_IDS["warning"]
+
 
 @dataclass(frozen=True)
 class ValidationMessage:
     """
     Single validation message produced by a validator.
     """
-    level: str     # "error", "warning", "success"
+    level: str     # "error", "warning", "info", "success"
     message: str
+    code: str = TEXT
+    args: tuple = ()
+
 
-@dataclass
 class ValidationResult:
     """
     Aggregated validation result for a file or validation unit.
+
+    Messages are stored compactly as a level id, a code id and an argument
+    tuple; the text is formatted only when .messages is read. Merged results
+    chain their parts instead of copying them.
+
+    With max_errors set, errors past the budget are dropped and a single
+    result.truncated warning is recorded instead. Validators check .exhausted
+    to stop walking a file once the budget is used up.
+
+    measurements holds the validators.metrics.Measurement records of an
+    instrumented run; it is empty unless instrumentation was requested.
     """
-    messages: List[ValidationMessage]
-    has_errors: bool = False
-    has_warnings: bool = False
+
+    def __init__(
+        self,
+        messages: Optional[List[ValidationMessage]] = None,
+        has_errors: bool = False,
+        has_warnings: bool = False,
+        max_errors: Optional[int] = None,
+    ):
+        self._levels = array("B")
+        self._codes = array("H")
+        self._args: list[tuple] = []
+        self._counts = [0] * len(LEVELS)
+        self._parts: list["ValidationResult"] = []
+        self._has_errors = has_errors
+        self._has_warnings = has_warnings
+        self.max_errors = max_errors
+        self._truncated = False
+        self.measurements: list = []
+
+        for m in messages or ():
+            if m.code == TEXT:
+                self.add(m.level, m.message)
+            else:
+                self.emit(m.level, m.code, *m.args)
 
     def add(self, level: str, message: str):
-        self.messages.append(ValidationMessage(level, message))
-        if level == "error":
-            self.has_errors = True
-        if level == "warning":
-            self.has_warnings = True
+        self.emit(level, TEXT, message)
+
+    def emit(self, level: str, code: str, *args):
+        level_id = _LEVEL_IDS[level]
+        if level_id == _ERROR and self.exhausted:
+            self.truncate()
+            return
+        self._levels.append(level_id)
+        self._codes.append(CODE_IDS[code])
+        self._args.append(args)
+        self._counts[level_id] += 1
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_errors is not None and self._counts[_ERROR] >= self.max_errors
+
+    @property
+    def errors_left(self) -> Optional[int]:
+        if self.max_errors is None:
+            return None
+        return max(self.max_errors - self._counts[_ERROR], 0)
+
+    def truncate(self):
+        """
+        Record that checks were skipped because the error budget ran out.
+        """
+        if not self._truncated:
+            self._truncated = True
+            self.emit("warning", "result.truncated")
+
+    def _chain(self) -> Iterator["ValidationResult"]:
+        stack = [self]
+        while stack:
+            result = stack.pop()
+            yield result
+            stack.extend(reversed(result._parts))
+
+    def iter_entries(self) -> Iterator[tuple[str, str, tuple]]:
+        """
+        (level, code, args) of every message, without formatting the text.
+        Parts come first (in merge order), then messages added after the merge.
+        """
+        stack: list[tuple[ValidationResult, bool]] = [(self, False)]
+        while stack:
+            result, expanded = stack.pop()
+            if not expanded:
+                stack.append((result, True))
+                stack.extend((part, False) for part in reversed(result._parts))
+                continue
+
+            for level_id, code_id, args in zip(result._levels, result._codes, result._args):
+                yield LEVELS[level_id], CODES[code_id], args
+
+    def iter_measurements(self) -> Iterator:
+        for result in self._chain():
+            yield from result.measurements
+
+    def iter_messages(self) -> Iterator[ValidationMessage]:
+        for level, code, args in self.iter_entries():
+            yield ValidationMessage(level, format_message(code, args), code, args)
+
+    @property
+    def messages(self) -> List[ValidationMessage]:
+        return list(self.iter_messages())
+
+    def count(self, level: str) -> int:
+        level_id = _LEVEL_IDS[level]
+        return sum(result._counts[level_id] for result in self._chain())
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {level: self.count(level) for level in LEVELS}
+
+    @property
+    def total(self) -> int:
+        return sum(len(result._args) for result in self._chain())
+
+    @property
+    def has_errors(self) -> bool:
+        return any(r._has_errors or r._counts[_ERROR] for r in self._chain())
+
+    @property
+    def has_warnings(self) -> bool:
+        return any(r._has_warnings or r._counts[_WARNING] for r in self._chain())
+
+    @property
+    def truncated(self) -> bool:
+        return any(r._truncated for r in self._chain())
+
 
 def merge_validation_results(*results: ValidationResult) -> ValidationResult:
-    messages: List[ValidationMessage] = []
-    has_errors = False
-    has_warnings = False
-
-    for r in results:
-        if r is None:
-            continue
-        messages.extend(r.messages)
-        has_errors = has_errors or r.has_errors
-        has_warnings = has_warnings or r.has_warnings
-
-    return ValidationResult(messages, has_errors, has_warnings)
+    merged = ValidationResult()
+    merged._parts = [r for r in results if r is not None]
+    return merged
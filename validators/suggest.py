@@ -0,0 +1,201 @@
+"""
+"Did you mean" suggestions for misspelled register and command names.
+
+Register names are dotted paths built from a small vocabulary of segments
+("control.contactor.main"), and a misspelling almost always sits inside one
+segment. NameIndex therefore matches segment by segment: each segment of
+the missing name is looked up in a symmetric-delete index of all segments
+(every segment stored under its single, and for long segments double,
+character deletions), and a close segment is only suggested if swapping it
+in gives an existing name. A lookup costs a few hundred dict probes
+whatever the map size. The maps of a project mostly share their segments,
+so their NameIndexes can share one SegmentIndex.
+
+Segments of up to 7 characters allow one edit, longer ones two. Edits are
+insertions, deletions, substitutions and adjacent transpositions. When no
+segment matches, names one edit away through a separator are tried
+("control.contactormain" for "control.contactor.main"); together with the
+segment matches that covers every name one edit away.
+"""
+
+from typing import Iterable, Optional
+
+MAX_SUGGESTIONS = 3
+# Segments at least this long allow two edits instead of one
+LONG_SEGMENT = 8
+
+
+def segment_max_distance(segment: str) -> int:
+    return 2 if len(segment) >= LONG_SEGMENT else 1
+
+
+def _deletes(word: str, distance: int) -> set[str]:
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    if len(a) > len(b):
+        a, b = b, a
+    # First difference, then the rest must line up after one edit
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    if a[i + 1:] == b[i + 1:]:
+        return True
+    # Adjacent transposition
+    return i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), or None when it exceeds max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if a == b:
+        return 0
+    if max_distance == 1:
+        return 1 if _one_edit_apart(a, b) else None
+
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return None
+        previous2, previous = previous, current
+
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class SegmentIndex:
+    """
+    Symmetric-delete index of name segments.
+    """
+
+    def __init__(self, segments: Iterable[str] = ()):
+        self._vocabulary: set[str] = set()
+        # deletion variant -> segments it was derived from
+        self._variants: dict[str, list[str]] = {}
+        self._close: dict[str, list[tuple[int, str]]] = {}
+        self.add(segments)
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+    def add(self, segments: Iterable[str]):
+        new = set(segments) - self._vocabulary
+        if not new:
+            return
+        self._vocabulary |= new
+        self._close.clear()
+        for segment in new:
+            for variant in _deletes(segment, segment_max_distance(segment)):
+                self._variants.setdefault(variant, []).append(segment)
+
+    def close(self, segment: str) -> list[tuple[int, str]]:
+        """
+        (distance, segment) for the indexed segments within the edit
+        distance allowed for segment, excluding segment itself.
+        """
+        close = self._close.get(segment)
+        if close is not None:
+            return close
+
+        candidates = set()
+        for variant in _deletes(segment, segment_max_distance(segment)):
+            candidates.update(self._variants.get(variant, ()))
+
+        close = []
+        for candidate in candidates:
+            max_distance = min(segment_max_distance(segment), segment_max_distance(candidate))
+            distance = edit_distance(segment, candidate, max_distance)
+            if distance:
+                close.append((distance, candidate))
+        self._close[segment] = close
+        return close
+
+
+class NameIndex:
+    def __init__(self, names: Iterable[str], segments: Optional[SegmentIndex] = None):
+        self._names: set[str] = {name for name in names if isinstance(name, str)}
+        # One join and split instead of a split per name
+        self._vocabulary = set(".".join(self._names).split(".")) if self._names else set()
+        self._alphabet: Optional[set[str]] = None
+        self._cache: dict[str, list[str]] = {}
+
+        if segments is None:
+            segments = SegmentIndex()
+        segments.add(self._vocabulary)
+        self._segments = segments
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def _separator_edits(self, name: str) -> set[str]:
+        """
+        Every string one edit away from name where the edit inserts, deletes,
+        replaces or moves a separator.
+        """
+        if self._alphabet is None:
+            self._alphabet = set("".join(self._vocabulary))
+
+        edits = {name[:i] + "." + name[i:] for i in range(len(name) + 1)}
+        for i, char in enumerate(name):
+            if char != ".":
+                edits.add(name[:i] + "." + name[i + 1:])
+                continue
+            edits.add(name[:i] + name[i + 1:])
+            edits.update(name[:i] + replacement + name[i + 1:] for replacement in self._alphabet)
+            if i > 0:
+                edits.add(name[:i - 1] + "." + name[i - 1] + name[i + 1:])
+            if i + 1 < len(name):
+                edits.add(name[:i] + name[i + 1] + "." + name[i + 2:])
+        edits.discard(name)
+        return edits
+
+    def suggest(self, name: str, limit: int = MAX_SUGGESTIONS) -> list[str]:
+        """
+        Existing names one misspelled segment (or one separator edit) away
+        from name, nearest first.
+        """
+        cached = self._cache.get(name)
+        if cached is not None:
+            return cached[:limit]
+
+        segments = name.split(".")
+        # Segments that exist nowhere in the map are the likely misspellings
+        unknown = [i for i, segment in enumerate(segments) if segment not in self._vocabulary]
+        scored = set()
+        for i in unknown or range(len(segments)):
+            for distance, replacement in self._segments.close(segments[i]):
+                candidate = ".".join(segments[:i] + [replacement] + segments[i + 1:])
+                if candidate in self._names:
+                    scored.add((distance, candidate))
+        if not scored:
+            scored = {(1, candidate) for candidate in self._separator_edits(name) if candidate in self._names}
+
+        suggestions = [candidate for _, candidate in sorted(scored)]
+        self._cache[name] = suggestions
+        return suggestions[:limit]
+
+
+def format_suggestions(names: list[str]) -> str:
+    return " or ".join(f"'{name}'" for name in names)